@@ -67,3 +67,19 @@ class Cell(FixedAgent):
     def assume_state(self):
         """Set the state to the new computed state."""
         self.state = self._next_state
+
+
+class BitboardCell(Cell):
+    """
+    Cell of a model run with a packed engine ("bitboard" or "history"):
+    its state is a bit of the model's packed rows instead of an attribute,
+    so stepping the model never touches the agents.
+    """
+
+    @property
+    def state(self):
+        return self.model.cell_state(self.x, self.y)
+
+    @state.setter
+    def state(self, value):
+        self.model.set_cell_state(self.x, self.y, value)
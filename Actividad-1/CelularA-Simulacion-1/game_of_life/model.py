@@ -1,16 +1,38 @@
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
-from .agent import Cell
+from .agent import BitboardCell, Cell
+from .bitboard import CELL_RULE, check_rule, next_row
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None, rule=CELL_RULE, engine="agents"):
+        """Create a new playing area of (width, height) cells.
+
+        rule is the Wolfram number of the elementary rule, 90 being the one
+        Cell implements. engine="agents" steps every Cell agent, engine="bitboard"
+        keeps each row packed in a Python int and computes the rows with
+        bitwise operations (see bitboard.next_row); it takes any rule.
+        engine="history" only computes the one new generation of the top
+        row that each step reveals (see cell_state); it takes any rule too.
+        """
         super().__init__(seed=seed)
         self.width = width
         self.height = height
+        if engine not in ("agents", "bitboard", "history"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'agents', 'bitboard' or 'history'")
+        if engine == "agents" and check_rule(rule) != CELL_RULE:
+            raise ValueError(f"The agents engine only runs rule {CELL_RULE}, use engine='bitboard'")
+        self.engine = engine
+        self.rule = check_rule(rule)
+        # Row y of the grid with bit x holding cell (x, y), bitboard engine only
+        self.rows = [0] * height if engine == "bitboard" else None
+        # History engine only: generation d of the top row at index d, packed
+        # like rows, and the state shared by every cell the top row hasn't
+        # reached yet
+        self.generations = [0] if engine == "history" else None
+        self.background = Cell.DEAD
         """Grid where cells are connected to their 8 neighbors.
 
         Example for two dimensions:
@@ -27,8 +49,9 @@ class ConwaysGameOfLife(Model):
 
         # The only thing I changed here is for the initial states to only give alive states to the first row. Which is done by equalling cell.coordinate 
         # to height - 1. Meaning it will only generate the first row.
+        cell_class = Cell if engine == "agents" else BitboardCell
         for cell in self.grid.all_cells:
-            Cell(
+            cell_class(
                 self,
                 cell,
                 init_state=(
@@ -39,11 +62,55 @@ class ConwaysGameOfLife(Model):
 
         self.running = True
 
+    def cell_state(self, x, y):
+        """State of cell (x, y) with the bitboard or the history engine.
+
+        The top row never changes and every other row becomes the rule applied
+        to the row above, so after t steps the row d rows below the top holds
+        generation d of the top row if d <= t. Rows further down have only
+        seen the all-dead rows they started with, t times over.
+        """
+        if self.engine == "bitboard":
+            return self.rows[y] >> x & 1
+        depth = self.height - 1 - y
+        if depth < len(self.generations):
+            return self.generations[depth] >> x & 1
+        return self.background
+
+    def set_cell_state(self, x, y, value):
+        """Set cell (x, y) with the bitboard or the history engine."""
+        if self.engine == "bitboard":
+            if value == Cell.ALIVE:
+                self.rows[y] |= 1 << x
+            else:
+                self.rows[y] &= ~(1 << x)
+        elif value != self.cell_state(x, y):
+            # The lower rows are derived from the initial top row
+            if y != self.height - 1 or self.steps:
+                raise ValueError("The history engine only lets the top row be set, before the first step")
+            self.generations[0] ^= 1 << x
+
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells assume their next state (whether they will be dead or alive)
         - Then, all cells change state to their next state.
+
+        With the bitboard engine each row below the top one becomes the rule
+        applied to the row above it, one whole row at a time.
         """
+        if self.engine == "bitboard":
+            rows = self.rows
+            self.rows = [next_row(rows[y + 1], self.width, self.rule) for y in range(self.height - 1)]
+            self.rows.append(rows[-1])
+            return
+        if self.engine == "history":
+            # Each step reveals one more generation; once it reaches the bottom
+            # row the grid no longer changes
+            if len(self.generations) < self.height:
+                self.generations.append(next_row(self.generations[-1], self.width, self.rule))
+            # A uniform row stays uniform: all cells see pattern 111 or 000
+            self.background = self.rule >> (7 if self.background else 0) & 1
+            return
         self.agents.do("determine_state")
         self.agents.do("assume_state")
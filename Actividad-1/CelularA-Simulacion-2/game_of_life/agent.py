@@ -58,3 +58,15 @@ class Cell(FixedAgent):
     def assume_state(self):
         """Set the state to the new computed state."""
         self.state = self._next_state
+
+
+class ArrayCell(Cell):
+    """Cell for engine="array", a view of its entry in model.states."""
+
+    @property
+    def state(self):
+        return int(self.model.states[self.x, self.y])
+
+    @state.setter
+    def state(self, value):
+        self.model.states[self.x, self.y] = value
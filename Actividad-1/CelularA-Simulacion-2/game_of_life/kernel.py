@@ -0,0 +1,42 @@
+import numpy as np
+
+# Cell.determine_state reads the three cells above with the same table as
+# Simulacion-1's Cell, Wolfram rule 90
+CELL_RULE = 90
+
+
+def rule_lut(rule):
+    """
+    The rule as a one-byte lookup table: bit p is the next state for the
+    pattern p = (top-left, top, top-right) read as a 3-bit number.
+    """
+    if rule not in range(256):
+        raise ValueError(f"rule must be in 0..255, got {rule}")
+    return np.uint8(rule)
+
+
+def step_rule(states, lut):
+    """
+    Next generation when every cell applies the rule to the three cells
+    above it, wrapping around. states is a uint8 array indexed [x, y].
+    """
+    above = np.roll(states, -1, axis=1)
+    pattern = np.roll(above, 1, axis=0)
+    pattern <<= 2
+    pattern |= above << 1
+    pattern |= np.roll(above, -1, axis=0)
+    # Shifting the packed table is cheaper than a fancy-indexed lookup
+    np.right_shift(lut, pattern, out=pattern)
+    pattern &= 1
+    return pattern
+
+
+def step_conway(states):
+    """
+    Next generation of Conway's Game of Life (B3/S23) over the 8 Moore
+    neighbors, wrapping around. states is a uint8 array indexed [x, y].
+    """
+    # The Moore neighbor count is separable: sum along x, then along y
+    rows = states + np.roll(states, 1, axis=0) + np.roll(states, -1, axis=0)
+    neighbors = rows + np.roll(rows, 1, axis=1) + np.roll(rows, -1, axis=1) - states
+    return ((neighbors == 3) | ((states == 1) & (neighbors == 2))).astype(np.uint8)
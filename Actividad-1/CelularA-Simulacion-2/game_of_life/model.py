@@ -1,16 +1,45 @@
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
-from .agent import Cell
+from .agent import ArrayCell, Cell
+from .kernel import CELL_RULE, rule_lut, step_conway, step_rule
 
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
 
-    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None):
-        """Create a new playing area of (width, height) cells."""
+    def __init__(self, width=50, height=50, initial_fraction_alive=0.2, seed=None,
+                 engine="agents", rule=CELL_RULE, conway=False):
+        """Create a new playing area of (width, height) cells.
+
+        engine="agents" steps every Cell agent. engine="array" keeps the states
+        in a uint8 array and computes each generation with whole-array NumPy
+        operations (see kernel.py); the grid and its Cell agents are only built
+        when something (like the Solara page) asks for model.grid. The array
+        engine runs any Wolfram rule, or Conway's B3/S23 rule over the 8 Moore
+        neighbors with conway=True.
+        """
         super().__init__(seed=seed)
         self.width = width
         self.height = height
+        if engine not in ("agents", "array"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'agents' or 'array'")
+        self.lut = rule_lut(rule)
+        if engine == "agents" and (rule != CELL_RULE or conway):
+            raise ValueError(f"The agents engine only runs rule {CELL_RULE}, use engine='array'")
+        self.engine = engine
+        self.rule = rule
+        self.conway = conway
+
+        if engine == "array":
+            # Same draws in the same (x, y) order as the agents engine below
+            draws = np.array([self.random.random() for _ in range(width * height)])
+            self.states = (draws < initial_fraction_alive).astype(np.uint8).reshape(width, height)
+            self._grid = None
+            self.running = True
+            return
+
+        self.states = None
         """Grid where cells are connected to their 8 neighbors.
 
         Example for two dimensions:
@@ -36,11 +65,28 @@ class ConwaysGameOfLife(Model):
 
         self.running = True
 
+    @property
+    def grid(self):
+        if self._grid is None:
+            self._grid = OrthogonalMooreGrid((self.width, self.height), capacity=1, torus=True, random=self.random)
+            for cell in self._grid.all_cells:
+                ArrayCell(self, cell, init_state=self.states[cell.coordinate])
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        self._grid = grid
+
     def step(self):
         """Perform the model step in two stages:
 
         - First, all cells assume their next state (whether they will be dead or alive)
         - Then, all cells change state to their next state.
+
+        The array engine does both stages at once for the whole grid.
         """
+        if self.engine == "array":
+            self.states = step_conway(self.states) if self.conway else step_rule(self.states, self.lut)
+            return
         self.agents.do("determine_state")
         self.agents.do("assume_state")
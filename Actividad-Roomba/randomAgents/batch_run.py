@@ -0,0 +1,153 @@
+"""
+Headless parameter sweep for the Roomba cleaning simulation.
+
+Runs every combination of the given parameters in a process pool and
+streams one summary row per run to a CSV or Parquet file as runs finish.
+Only the model is imported, so workers don't pay for the Solara UI.
+
+Example:
+    python batch_run.py --num-agents 1 2 4 --num-obstacles 0 15 40 \\
+        --grid-size 28 50x40 --replicates 20 --out sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import sys
+
+from random_agents.model import RandomModel
+
+FIELDS = [
+    "num_agents", "num_obstacles", "num_dirty_tiles", "width", "height",
+    "seed", "max_steps", "steps", "steps_to_clean", "total_movements",
+    "battery_deaths", "final_clean_percentage",
+]
+
+
+def run_one(params):
+    """Run a single model to completion and return its summary row."""
+    model = RandomModel(**params)
+    while model.running and model.steps_taken < model.max_steps:
+        model.step()
+
+    row = dict(params)
+    row["steps"] = model.steps_taken
+    row["steps_to_clean"] = model.steps_taken if model.count_dirty_tiles() == 0 else None
+    row["total_movements"] = sum(model.get_all_roomba_movements())
+    row["battery_deaths"] = sum(1 for roomba in model.roombas if roomba.battery <= 0)
+    row["final_clean_percentage"] = model.percentage_clean_tiles()
+    return row
+
+
+def parse_size(text):
+    """Parse a grid size given as "N" (square) or "WxH"."""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def build_configs(args):
+    seeds = args.seeds if args.seeds else range(args.base_seed, args.base_seed + args.replicates)
+    for agents, obstacles, dirty, (width, height), seed in itertools.product(
+            args.num_agents, args.num_obstacles, args.num_dirty_tiles, args.grid_size, seeds):
+        yield {
+            "num_agents": agents,
+            "num_obstacles": obstacles,
+            "num_dirty_tiles": dirty,
+            "width": width,
+            "height": height,
+            "seed": seed,
+            "max_steps": args.max_steps,
+        }
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Buffers rows and appends them to the file as Parquet row groups."""
+
+    def __init__(self, path, batch_size=256):
+        # Optional dependency, only needed for .parquet output
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ("num_agents", pa.int64()), ("num_obstacles", pa.int64()),
+            ("num_dirty_tiles", pa.int64()), ("width", pa.int64()),
+            ("height", pa.int64()), ("seed", pa.int64()),
+            ("max_steps", pa.int64()), ("steps", pa.int64()),
+            ("steps_to_clean", pa.int64()), ("total_movements", pa.int64()),
+            ("battery_deaths", pa.int64()), ("final_clean_percentage", pa.float64()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_sink(path):
+    if path.endswith(".parquet"):
+        return ParquetSink(path)
+    return CsvSink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch sweep of the Roomba cleaning simulation.")
+    parser.add_argument("--num-agents", type=int, nargs="+", default=[1])
+    parser.add_argument("--num-obstacles", type=int, nargs="+", default=[15])
+    parser.add_argument("--num-dirty-tiles", type=int, nargs="+", default=[20])
+    parser.add_argument("--grid-size", type=parse_size, nargs="+", default=[(28, 28)],
+                        help='square size "N" or "WxH"')
+    parser.add_argument("--seeds", type=int, nargs="+",
+                        help="explicit seeds (overrides --replicates/--base-seed)")
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=4)
+    parser.add_argument("--out", default="roomba_sweep.csv",
+                        help="output file, .csv or .parquet")
+    args = parser.parse_args(argv)
+
+    sink = open_sink(args.out)
+    done = 0
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for row in pool.imap_unordered(run_one, build_configs(args), args.chunksize):
+                sink.write(row)
+                done += 1
+    finally:
+        sink.close()
+
+    print(f"{done} runs written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmarks for RandomModel construction and stepping.
+
+For every combination of grid size, fleet size, obstacle density and
+engine it records construction time, steady-state steps per second and
+peak traced memory. Results are written to a JSON file tagged with the
+current git commit so runs on different commits can be compared.
+
+Example:
+    python benchmark.py --sizes 28 100 500 --fleets 1 10 100 \\
+        --densities 0 0.2 0.4 --out bench.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import mesa
+import numpy as np
+
+from random_agents.model import RandomModel
+
+
+def case_params(size, fleet, density, dirt, seed):
+    interior = (size - 2) ** 2
+    return {
+        "num_agents": fleet,
+        "num_obstacles": int(interior * density),
+        "num_dirty_tiles": int(interior * dirt),
+        "width": size,
+        "height": size,
+        "seed": seed,
+        # Never stop on max_steps while being timed
+        "max_steps": 10 ** 9,
+    }
+
+
+def run_case(params, engine, warmup, steps, repeats):
+    """Time construction and stepping of one configuration."""
+    build_times = []
+    step_rates = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = RandomModel(engine=engine, **params)
+        build_times.append(time.perf_counter() - start)
+
+        for _ in range(warmup):
+            model.step()
+        start = time.perf_counter()
+        for _ in range(steps):
+            model.step()
+        step_rates.append(steps / (time.perf_counter() - start))
+
+    # Memory is measured in a separate pass, tracemalloc slows everything down
+    tracemalloc.start()
+    model = RandomModel(engine=engine, **params)
+    for _ in range(warmup + steps):
+        model.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "build_seconds": min(build_times),
+        "steps_per_second": max(step_rates),
+        "steps_per_second_median": float(np.median(step_rates)),
+        "peak_memory_bytes": peak,
+        "roombas": len(model.roombas),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Roomba cleaning simulation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[28, 50, 100, 200, 500])
+    parser.add_argument("--fleets", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.2, 0.4],
+                        help="fraction of interior cells turned into obstacles")
+    parser.add_argument("--dirt", type=float, default=0.1,
+                        help="fraction of interior cells that start dirty")
+    parser.add_argument("--engines", nargs="+", default=["agents", "vectorized"],
+                        choices=["agents", "vectorized"])
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="roomba_bench.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size, fleet, density, engine in itertools.product(
+            args.sizes, args.fleets, args.densities, args.engines):
+        if fleet > size - 2:
+            # Zones would be empty, RandomModel can't place that many Roombas
+            continue
+        params = case_params(size, fleet, density, args.dirt, args.seed)
+        result = run_case(params, engine, args.warmup, args.steps, args.repeats)
+        result.update(size=size, fleet=fleet, density=density, engine=engine, params=params)
+        results.append(result)
+        print(f"size={size} fleet={fleet} density={density} engine={engine}: "
+              f"build {result['build_seconds']:.3f}s, "
+              f"{result['steps_per_second']:.1f} steps/s, "
+              f"peak {result['peak_memory_bytes'] / 2 ** 20:.1f} MiB", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "mesa": mesa.__version__,
+        "numpy": np.__version__,
+        "settings": {"warmup": args.warmup, "steps": args.steps, "repeats": args.repeats,
+                     "dirt": args.dirt, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
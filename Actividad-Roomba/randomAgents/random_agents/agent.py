@@ -1,34 +1,45 @@
+import numpy as np
 from mesa.discrete_space import CellAgent, FixedAgent
 
+from .pathing import UNREACHABLE, is_adjacent, shortest_path
+
+# Visit counts are uint16 and saturate instead of wrapping around
+MAX_VISITS = 2 ** 16 - 1
+
+# Battery levels, in percent
+FULL_BATTERY = 100
+CHARGE_RATE = 5
+LOW_BATTERY = 30
+
 
 class RandomAgent(CellAgent):
     """
-    Roomba agent that cleans floor tiles using a snake pattern.
+    Roomba agent that cleans floor tiles following its zone's coverage plan.
     Battery management: 1% per action, recharges 5% per step at station.
     Returns to home station when battery < 30%.
     """
 
-    def __init__(self, model, cell, battery=100, home_station_pos=None, zone=None):
+    def __init__(self, model, cell, battery=FULL_BATTERY, home_station_pos=None, zone=None):
         super().__init__(model)
         self.cell = cell
         self.battery = battery
         self.movements = 0
         self.home_station_pos = home_station_pos
         self.zone = zone  # (min_x, max_x, min_y, max_y)
-        self.going_up = True
-        self.visit_count = {}
+        self.plan = None  # coverage plan being followed, see next_plan_position
+        self.plan_cells = None  # the plan as an (n, 2) array
+        self.plan_cursor = 0
+        self.route = []
+        self.slot = model.register_roomba(self)
 
         if cell:
-            self.visit_count[cell.coordinate] = 1
+            self.visit_cell(cell.coordinate)
 
     def is_on_charging_station(self):
-        return any(isinstance(agent, StationAgent) for agent in self.cell.agents)
+        return bool(self.model.station_mask[self.cell.coordinate])
 
     def is_on_dirty_floor(self):
-        for agent in self.cell.agents:
-            if isinstance(agent, FloorAgent) and not agent.fully_clean:
-                return True
-        return False
+        return bool(self.model.dirty_mask[self.cell.coordinate])
 
     def get_floor_agent(self):
         for agent in self.cell.agents:
@@ -48,31 +59,81 @@ class RandomAgent(CellAgent):
 
     def charge_battery(self):
         if self.is_on_charging_station():
-            self.battery = min(100, self.battery + 5)
+            self.battery = min(FULL_BATTERY, self.battery + CHARGE_RATE)
             return True
         return False
 
-    def can_move_to(self, x, y):
-        if not self.zone:
-            return False
-        min_x, max_x, min_y, max_y = self.zone
-        if x < min_x or x > max_x or y < min_y or y > max_y:
-            return False
-
-        try:
-            target_cell = self.model.grid[(x, y)]
-            has_obstacle = any(isinstance(a, ObstacleAgent) for a in target_cell.agents)
-            return not has_obstacle and self.visit_count.get((x, y), 0) == 0
-        except:
-            return False
-
     def get_visit_count(self, pos):
-        return self.visit_count.get(pos, 0)
+        return int(self.model.visit_counts[(self.slot, *pos)])
 
     def visit_cell(self, pos):
-        self.visit_count[pos] = self.visit_count.get(pos, 0) + 1
+        index = (self.slot, *pos)
+        visits = self.model.visit_counts
+        if visits[index] < MAX_VISITS:
+            visits[index] += 1
 
     # --- movement logic ---
+    def move_to(self, cell):
+        self.cell = cell
+        self.visit_cell(cell.coordinate)
+        self.battery -= 1
+        self.movements += 1
+        return True
+
+    def next_plan_position(self):
+        """
+        Next cell on the zone's coverage plan, or None once the Roomba has
+        visited every cell of it.
+
+        The cursor points at the next plan cell to reach. While that cell
+        is a neighbor the Roomba hasn't visited, it just steps there.
+        Otherwise (after a dirty neighbor or a trip home, or when the plan
+        runs over cells it already crossed) it rejoins the plan at the
+        nearest cell it hasn't visited, following a shortest route there.
+        """
+        plan = self.model.coverage_plan(self.zone, self.home_station_pos)
+        if plan is not self.plan:
+            self.plan = plan
+            self.plan_cells = np.array(plan, dtype=np.int64).reshape(len(plan), 2)
+            self.plan_cursor = 0
+            self.route = []
+
+        pos = self.cell.coordinate
+        if self.plan_cursor < len(plan) and pos == plan[self.plan_cursor]:
+            self.plan_cursor += 1
+            self.route = []
+        if self.plan_cursor < len(plan):
+            target = plan[self.plan_cursor]
+            if is_adjacent(pos, target) and self.get_visit_count(target) == 0:
+                return target
+
+        # The route is stored reversed so each step pops from the end
+        if not self.route or not is_adjacent(pos, self.route[-1]):
+            cursor = self.nearest_unvisited_plan_index(pos)
+            if cursor is None:
+                return None
+            self.plan_cursor = cursor
+            target = plan[cursor]
+            if is_adjacent(pos, target):
+                return target
+            route = shortest_path(self.model.obstacle_mask, pos, target)
+            if route is None:
+                return None
+            self.route = route[:0:-1]
+        return self.route.pop()
+
+    def nearest_unvisited_plan_index(self, pos):
+        """
+        Plan index of the closest (Chebyshev) cell this Roomba hasn't
+        visited, the earliest one on ties, or None if it visited them all.
+        """
+        xs, ys = self.plan_cells[:, 0], self.plan_cells[:, 1]
+        unvisited = self.model.visit_counts[self.slot, xs, ys] == 0
+        if not unvisited.any():
+            return None
+        distance = np.maximum(np.abs(xs - pos[0]), np.abs(ys - pos[1]))
+        return int(np.argmin(np.where(unvisited, distance, UNREACHABLE)))
+
     def move_snake_pattern(self):
         if self.battery <= 0:
             return False
@@ -80,89 +141,16 @@ class RandomAgent(CellAgent):
         if self.move_to_dirty_neighbor():
             return True
 
-        if not self.zone:
+        if not self.zone or not self.home_station_pos:
             return self.move_to_unvisited_neighbor()
 
-        min_x, max_x, min_y, max_y = self.zone
-        current_x, current_y = self.cell.coordinate
-
-        if self.going_up:
-            if self.can_move_to(current_x, current_y + 1):
-                new_pos = (current_x, current_y + 1)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            if self.can_move_to(current_x - 1, current_y):
-                new_pos = (current_x - 1, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            if self.can_move_to(current_x + 1, current_y):
-                new_pos = (current_x + 1, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            self.going_up = False
-            target_x = current_x + 1
-            if target_x <= max_x and self.can_move_to(target_x, current_y):
-                new_pos = (target_x, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-        else:
-            if self.can_move_to(current_x, current_y - 1):
-                new_pos = (current_x, current_y - 1)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            if self.can_move_to(current_x - 1, current_y):
-                new_pos = (current_x - 1, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            if self.can_move_to(current_x + 1, current_y):
-                new_pos = (current_x + 1, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-            self.going_up = True
-            target_x = current_x + 1
-            if target_x <= max_x and self.can_move_to(target_x, current_y):
-                new_pos = (target_x, current_y)
-                self.cell = self.model.grid[new_pos]
-                self.visit_cell(new_pos)
-                self.battery -= 1
-                self.movements += 1
-                return True
-
-        return self.move_to_unvisited_neighbor()
+        next_pos = self.next_plan_position()
+        if next_pos is None:
+            return self.move_to_unvisited_neighbor()
+        return self.move_to(self.model.grid[next_pos])
 
     def has_dirty_floor(self, cell):
-        for agent in cell.agents:
-            if isinstance(agent, FloorAgent) and not agent.fully_clean:
-                return True
-        return False
+        return bool(self.model.dirty_mask[cell.coordinate])
 
     def move_to_dirty_neighbor(self):
         if self.battery <= 0:
@@ -171,19 +159,14 @@ class RandomAgent(CellAgent):
         dirty_neighbors = []
 
         for neighbor_cell in self.cell.neighborhood:
-            has_obstacle = any(isinstance(agent, ObstacleAgent) for agent in neighbor_cell.agents)
+            has_obstacle = self.model.obstacle_mask[neighbor_cell.coordinate]
             if not has_obstacle and self.has_dirty_floor(neighbor_cell):
                 visit_count = self.get_visit_count(neighbor_cell.coordinate)
                 dirty_neighbors.append((neighbor_cell, visit_count))
 
         if dirty_neighbors:
             dirty_neighbors.sort(key=lambda x: x[1])
-            best_dirty = dirty_neighbors[0][0]
-            self.cell = best_dirty
-            self.visit_cell(best_dirty.coordinate)
-            self.battery -= 1
-            self.movements += 1
-            return True
+            return self.move_to(dirty_neighbors[0][0])
 
         return False
 
@@ -195,7 +178,7 @@ class RandomAgent(CellAgent):
 
         for neighbor_cell in self.cell.neighborhood:
             neighbor_pos = neighbor_cell.coordinate
-            has_obstacle = any(isinstance(agent, ObstacleAgent) for agent in neighbor_cell.agents)
+            has_obstacle = self.model.obstacle_mask[neighbor_cell.coordinate]
             if not has_obstacle:
                 visit_count = self.get_visit_count(neighbor_pos)
                 available_neighbors.append((neighbor_cell, visit_count))
@@ -207,12 +190,7 @@ class RandomAgent(CellAgent):
         min_visits = available_neighbors[0][1]
         best_neighbors = [cell for cell, count in available_neighbors if count == min_visits]
 
-        next_cell = self.random.choice(best_neighbors)
-        self.cell = next_cell
-        self.visit_cell(next_cell.coordinate)
-        self.battery -= 1
-        self.movements += 1
-        return True
+        return self.move_to(self.random.choice(best_neighbors))
 
     def move_to_random_neighbor(self):
         if self.battery <= 0:
@@ -221,22 +199,17 @@ class RandomAgent(CellAgent):
         valid_neighbors = []
 
         for neighbor_cell in self.cell.neighborhood:
-            has_obstacle = any(isinstance(agent, ObstacleAgent) for agent in neighbor_cell.agents)
+            has_obstacle = self.model.obstacle_mask[neighbor_cell.coordinate]
             if not has_obstacle:
                 valid_neighbors.append(neighbor_cell)
 
         if valid_neighbors:
-            next_cell = self.random.choice(valid_neighbors)
-            self.cell = next_cell
-            self.visit_cell(next_cell.coordinate)
-            self.battery -= 1
-            self.movements += 1
-            return True
+            return self.move_to(self.random.choice(valid_neighbors))
 
         return False
 
     def needs_charging(self):
-        return self.battery < 30
+        return self.battery < LOW_BATTERY
 
     def get_direction_to_home_station(self):
         if not self.home_station_pos:
@@ -255,42 +228,29 @@ class RandomAgent(CellAgent):
         if not direction:
             return self.move_to_unvisited_neighbor()
 
-        current_x, current_y = self.cell.coordinate
-        valid_neighbors = []
-
-        for neighbor_cell in self.cell.neighborhood:
-            has_obstacle = any(isinstance(agent, ObstacleAgent) for agent in neighbor_cell.agents)
-            if not has_obstacle:
-                valid_neighbors.append(neighbor_cell)
-
-        if not valid_neighbors:
-            return False
-
+        # Obstacle cells are UNREACHABLE in the field, so they are never picked
+        distance_field = self.model.distance_to_station(self.home_station_pos)
         best_neighbor = None
-        best_distance = float('inf')
+        best_distance = UNREACHABLE
 
-        for neighbor in valid_neighbors:
-            nx, ny = neighbor.coordinate
-            distance = abs(self.home_station_pos[0] - nx) + abs(self.home_station_pos[1] - ny)
+        for neighbor_cell in self.cell.neighborhood:
+            distance = distance_field[neighbor_cell.coordinate]
             if distance < best_distance:
                 best_distance = distance
-                best_neighbor = neighbor
+                best_neighbor = neighbor_cell
 
-        if best_neighbor:
-            self.cell = best_neighbor
-            self.visit_cell(best_neighbor.coordinate)
-            self.battery -= 1
-            self.movements += 1
-            return True
+        # Cut off from the station: wander instead of pushing against a wall
+        if best_neighbor is None:
+            return self.move_to_unvisited_neighbor()
 
-        return False
+        return self.move_to(best_neighbor)
 
     def step(self):
         if self.battery <= 0:
             return
 
         # If on charging station and battery not full, charge and stay
-        if self.is_on_charging_station() and self.battery < 100:
+        if self.is_on_charging_station() and self.battery < FULL_BATTERY:
             self.charge_battery()
             return
 
@@ -317,6 +277,11 @@ class ObstacleAgent(FixedAgent):
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell = cell
+        model.set_obstacle(cell.coordinate, True)
+
+    def remove(self):
+        self.model.set_obstacle(self.cell.coordinate, False)
+        super().remove()
 
     def step(self):
         pass
@@ -327,6 +292,7 @@ class StationAgent(FixedAgent):
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell = cell
+        model.station_mask[cell.coordinate] = True
 
     def step(self):
         pass
@@ -341,12 +307,22 @@ class FloorAgent(FixedAgent):
 
     @fully_clean.setter
     def fully_clean(self, value: bool) -> None:
+        if value != self._fully_clean:
+            delta = 1 if value else -1
+            self.model.clean_tiles += delta
+            self.model.dirty_tiles -= delta
         self._fully_clean = value
+        self.model.dirty_mask[self.cell.coordinate] = not value
 
     def __init__(self, model, cell, is_clean=False):
         super().__init__(model)
         self.cell = cell
         self._fully_clean = is_clean
+        model.dirty_mask[cell.coordinate] = not is_clean
+        if is_clean:
+            model.clean_tiles += 1
+        else:
+            model.dirty_tiles += 1
 
     def step(self):
         pass
@@ -0,0 +1,282 @@
+import numpy as np
+
+from .agent import (
+    CHARGE_RATE, FULL_BATTERY, LOW_BATTERY, MAX_VISITS, FloorAgent,
+)
+from .pathing import UNREACHABLE, is_adjacent, shortest_path
+
+NO_CELL = -1
+LAST_RANK = np.iinfo(np.int64).max
+
+
+class FleetEngine:
+    """
+    Steps every Roomba of a RandomModel at once from NumPy arrays.
+
+    Positions (as flat x * height + y indices), batteries, movement counts
+    and plan cursors live in arrays, and each tick classifies the whole
+    fleet into charge / home / clean / dirty-neighbor / plan moves with
+    array operations. It follows the same rules as RandomAgent.step,
+    which stays the reference implementation:
+
+    - The activation order replays agents.shuffle_do, so the model's
+      random stream is consumed exactly as in the object engine.
+    - A tile cleaned this tick is only seen as clean by Roombas that come
+      later in that order, and only the first Roomba on a dirty tile
+      cleans it.
+    - Random tie-breaks (move_to_unvisited_neighbor) are drawn one
+      Roomba at a time in activation order.
+
+    The RandomAgent objects are updated after every tick so the
+    DataCollector and the Solara portrayal keep working.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.roombas = list(model.roombas)
+        self.height = model.height
+
+        n = len(self.roombas)
+        coords = np.array([r.cell.coordinate for r in self.roombas], dtype=np.int64).reshape(n, 2)
+        self.flat = coords[:, 0] * self.height + coords[:, 1]
+        self.battery = np.array([r.battery for r in self.roombas], dtype=np.int64)
+        self.movements = np.array([r.movements for r in self.roombas], dtype=np.int64)
+        self.slots = np.array([r.slot for r in self.roombas], dtype=np.int64)
+        self.homes = [r.home_station_pos for r in self.roombas]
+        self.zones = [r.zone for r in self.roombas]
+        self.plannable = np.array([bool(r.zone and r.home_station_pos) for r in self.roombas])
+
+        # Index of each Roomba in model.agents, to replay shuffle_do's order
+        agent_index = {agent: i for i, agent in enumerate(model.agents)}
+        self.num_agents = len(agent_index)
+        self.agent_index = np.array([agent_index[r] for r in self.roombas], dtype=np.int64)
+        self.floors = {agent.cell.coordinate: agent for agent in agent_index
+                       if isinstance(agent, FloorAgent)}
+
+        # Neighbor table in cell.neighborhood order, filled in as Roombas
+        # reach new cells; missing neighbors are NO_CELL
+        cells = model.width * model.height
+        self.neighbors = np.full((cells, 8), NO_CELL, dtype=np.int64)
+        self._known = np.zeros(cells, dtype=bool)
+        self._cleaned_rank = np.full(cells, LAST_RANK, dtype=np.int64)
+
+        self.plan_flat = None
+        self.plan_len = np.zeros(n, dtype=np.int64)
+        self.cursor = np.zeros(n, dtype=np.int64)
+        self.routes = [[] for _ in range(n)]
+        self._layout_version = None
+
+    # --- lookups ---
+    def coordinate(self, flat):
+        return divmod(int(flat), self.height)
+
+    def neighbors_of(self, flat):
+        """Neighbor rows for an array of flat cells."""
+        for cell in np.unique(flat[~self._known[flat]]):
+            row = [x * self.height + y
+                   for x, y in (c.coordinate for c in self.model.grid[self.coordinate(cell)].neighborhood)]
+            self.neighbors[cell, :len(row)] = row
+            self._known[cell] = True
+        return self.neighbors[flat]
+
+    def _load_plans(self):
+        """(Re)load every Roomba's coverage plan after a layout change."""
+        plans = [self.model.coverage_plan(zone, home) if ok else ()
+                 for zone, home, ok in zip(self.zones, self.homes, self.plannable)]
+        self.plan_len = np.array([len(plan) for plan in plans], dtype=np.int64)
+        # One padding column so a finished cursor reads NO_CELL
+        self.plan_flat = np.full((len(plans), self.plan_len.max(initial=0) + 1), NO_CELL, dtype=np.int64)
+        for i, plan in enumerate(plans):
+            if plan:
+                xy = np.array(plan, dtype=np.int64)
+                self.plan_flat[i, :len(plan)] = xy[:, 0] * self.height + xy[:, 1]
+        self.cursor[:] = 0
+        self.routes = [[] for _ in plans]
+        self._layout_version = self.model.layout_version
+
+    # --- tick ---
+    def step(self):
+        model = self.model
+        obstacles = model.obstacle_mask.ravel()
+        dirty = model.dirty_mask.ravel()
+        stations = model.station_mask.ravel()
+        visits = model.visit_counts.reshape(len(model.visit_counts), -1)
+
+        order = list(range(self.num_agents))
+        model.random.shuffle(order)
+        activation = np.empty(self.num_agents, dtype=np.int64)
+        activation[order] = np.arange(self.num_agents)
+        rank = activation[self.agent_index]
+
+        flat = self.flat
+        battery = self.battery
+
+        alive = battery > 0
+        charging = alive & stations[flat] & (battery < FULL_BATTERY)
+        battery[charging] = np.minimum(FULL_BATTERY, battery[charging] + CHARGE_RATE)
+        homing = alive & ~charging & (battery < LOW_BATTERY)
+        active = alive & ~charging & ~homing
+
+        # Only the first Roomba in activation order cleans a shared dirty tile
+        on_dirty = np.flatnonzero(active & dirty[flat])
+        on_dirty = on_dirty[np.argsort(rank[on_dirty], kind="stable")]
+        _, first = np.unique(flat[on_dirty], return_index=True)
+        cleaners = on_dirty[first]
+        self._cleaned_rank[flat[cleaners]] = rank[cleaners]
+
+        is_cleaner = np.zeros(len(flat), dtype=bool)
+        is_cleaner[cleaners] = True
+        movers = np.flatnonzero(active & ~is_cleaner)
+
+        target = flat.copy()
+        moved = np.zeros(len(flat), dtype=bool)
+        wander = []  # Roombas falling back to move_to_unvisited_neighbor
+
+        # Homing: lowest distance-field neighbor, first one on ties
+        for r in np.flatnonzero(homing):
+            if not self.homes[r]:
+                wander.append(r)
+                continue
+            row = self.neighbors_of(flat[r:r + 1])[0]
+            row = row[row != NO_CELL]
+            distance = model.distance_to_station(self.homes[r]).ravel()[row]
+            best = int(np.argmin(distance))
+            if distance[best] == UNREACHABLE:
+                wander.append(r)
+            else:
+                target[r] = row[best]
+                moved[r] = True
+
+        # Dirty neighbor as seen at this Roomba's turn, fewest visits first
+        rows = self.neighbors_of(flat[movers])
+        valid = rows != NO_CELL
+        safe = np.where(valid, rows, 0)
+        free = valid & ~obstacles[safe]
+        seen_dirty = free & dirty[safe] & (self._cleaned_rank[safe] > rank[movers, None])
+        count = np.where(seen_dirty, visits[self.slots[movers, None], safe], np.iinfo(np.int64).max)
+        best = np.argmin(count, axis=1)
+        chasing = seen_dirty.any(axis=1)
+        chase = movers[chasing]
+        target[chase] = rows[chasing, best[chasing]]
+        moved[chase] = True
+
+        self._cleaned_rank[flat[cleaners]] = LAST_RANK
+
+        # Coverage plan: advance the cursor, then step to the next plan cell
+        planners = movers[~chasing]
+        wander.extend(planners[~self.plannable[planners]])
+        planners = planners[self.plannable[planners]]
+        if len(planners):
+            if self._layout_version != model.layout_version:
+                self._load_plans()
+            self._follow_plans(planners, visits, target, moved, wander)
+
+        for r in sorted(wander, key=lambda r: rank[r]):
+            self._wander(r, obstacles, visits, target, moved)
+
+        # Apply
+        for r in cleaners:
+            self.floors[self.coordinate(flat[r])].fully_clean = True
+        battery[cleaners] -= 1
+        battery[moved] -= 1
+        self.movements[moved] += 1
+        slots, cells = self.slots[moved], target[moved]
+        current = visits[slots, cells]
+        visits[slots, cells] = np.where(current < MAX_VISITS, current + 1, current)
+
+        self.flat = target
+        self._sync(moved)
+
+    def _follow_plans(self, planners, visits, target, moved, wander):
+        flat = self.flat
+        at_cursor = self.plan_flat[planners, self.cursor[planners]] == flat[planners]
+        self.cursor[planners[at_cursor]] += 1
+        for r in planners[at_cursor]:
+            self.routes[r] = []
+
+        # Step to the next plan cell while it is an unvisited neighbor
+        goal = self.plan_flat[planners, self.cursor[planners]]
+        on_plan = goal != NO_CELL
+        goal = np.where(on_plan, goal, 0)
+        gx, gy = np.divmod(goal, self.height)
+        x, y = np.divmod(flat[planners], self.height)
+        adjacent = np.maximum(np.abs(gx - x), np.abs(gy - y)) <= 1
+        step = on_plan & adjacent & (visits[self.slots[planners], goal] == 0)
+        target[planners[step]] = goal[step]
+        moved[planners[step]] = True
+
+        # Otherwise rejoin the plan at the nearest unvisited cell
+        for r in planners[~step]:
+            pos = self.coordinate(flat[r])
+            route = self.routes[r]
+            if not route or not is_adjacent(pos, route[-1]):
+                cursor = self._nearest_unvisited(r, pos, visits)
+                if cursor is None:
+                    wander.append(r)
+                    continue
+                self.cursor[r] = cursor
+                cell = self.plan_flat[r, cursor]
+                if is_adjacent(pos, self.coordinate(cell)):
+                    target[r] = cell
+                    moved[r] = True
+                    continue
+                path = shortest_path(self.model.obstacle_mask, pos, self.coordinate(cell))
+                if path is None:
+                    wander.append(r)
+                    continue
+                route = self.routes[r] = path[:0:-1]
+            x, y = route.pop()
+            target[r] = x * self.height + y
+            moved[r] = True
+
+    def _nearest_unvisited(self, r, pos, visits):
+        """Same choice as RandomAgent.nearest_unvisited_plan_index."""
+        cells = self.plan_flat[r, :self.plan_len[r]]
+        unvisited = visits[self.slots[r], cells] == 0
+        if not unvisited.any():
+            return None
+        xs, ys = np.divmod(cells, self.height)
+        distance = np.maximum(np.abs(xs - pos[0]), np.abs(ys - pos[1]))
+        return int(np.argmin(np.where(unvisited, distance, UNREACHABLE)))
+
+    def _wander(self, r, obstacles, visits, target, moved):
+        row = self.neighbors_of(self.flat[r:r + 1])[0]
+        row = row[row != NO_CELL]
+        row = row[~obstacles[row]]
+        if not len(row):
+            return
+        count = visits[self.slots[r], row]
+        best = [int(cell) for cell in row[count == count.min()]]
+        target[r] = self.model.random.choice(best)
+        moved[r] = True
+
+    def _sync(self, moved):
+        """Copy the arrays back onto the RandomAgent objects."""
+        grid = self.model.grid
+        for r in np.flatnonzero(moved):
+            self.roombas[r].cell = grid[self.coordinate(self.flat[r])]
+        for roomba, battery, movements in zip(self.roombas, self.battery.tolist(), self.movements.tolist()):
+            roomba.battery = battery
+            roomba.movements = movements
+
+
+def compare_engines(steps=300, **params):
+    """
+    Run the object and the vectorized engine side by side.
+
+    Returns the first step at which their clean-percentage curves differ,
+    or None if they match for the whole run.
+    """
+    from .model import RandomModel
+
+    reference = RandomModel(engine="agents", **params)
+    fleet = RandomModel(engine="vectorized", **params)
+    for step in range(1, steps + 1):
+        if not (reference.running or fleet.running):
+            break
+        reference.step()
+        fleet.step()
+        if reference.percentage_clean_tiles() != fleet.percentage_clean_tiles():
+            return step
+    return None
+
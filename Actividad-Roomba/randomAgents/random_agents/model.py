@@ -1,6 +1,10 @@
 import mesa
+import numpy as np
 from mesa.discrete_space import OrthogonalMooreGrid
 from .agent import RandomAgent, ObstacleAgent, FloorAgent, StationAgent
+from .fleet import FleetEngine
+from .pathing import bfs_distance_field
+from .planner import boustrophedon_plan
 
 
 class RandomModel(mesa.Model):
@@ -10,10 +14,13 @@ class RandomModel(mesa.Model):
     """
 
     def __init__(self, num_agents=1, num_obstacles=15, num_dirty_tiles=20,
-                 width=28, height=28, seed=42, max_steps=1000):
+                 width=28, height=28, seed=42, max_steps=1000, engine="agents"):
 
         super().__init__(seed=seed)
 
+        if engine not in ("agents", "vectorized"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'agents' or 'vectorized'")
+
         self.num_agents = num_agents
         self.num_obstacles = num_obstacles
         self.num_dirty_tiles = num_dirty_tiles
@@ -25,15 +32,37 @@ class RandomModel(mesa.Model):
         self.grid = OrthogonalMooreGrid([width, height], torus=False)
         self.datacollector = None
 
-        # Create border obstacles
-        border = [(x, y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height - 1] or x in [0, width - 1]]
+        # Dense per-cell layers indexed as [x, y], kept in sync by the agents
+        # so movement checks don't have to scan cell.agents.
+        self.obstacle_mask = np.zeros((width, height), dtype=bool)
+        self.dirty_mask = np.zeros((width, height), dtype=bool)
+        self.station_mask = np.zeros((width, height), dtype=bool)
+
+        # BFS distance fields keyed by station position, dropped whenever
+        # the obstacle layout changes (see set_obstacle)
+        self._station_fields = {}
+        # Coverage plans keyed by (zone, start), dropped on the same changes
+        self._coverage_plans = {}
+        self.layout_version = 0
+
+        # Running tile counters, updated by FloorAgent.fully_clean
+        self.dirty_tiles = 0
+        self.clean_tiles = 0
+
+        # Roombas by slot (slot i is "Roomba i + 1"), filled by RandomAgent
+        self.roombas = []
+        # Per-Roomba visit counts, indexed as [slot, x, y]
+        self.visit_counts = np.zeros((max(num_agents, 1), width, height), dtype=np.uint16)
+
+        # Placement works on flat x * height + y indices, which follow the
+        # order of grid.all_cells, so the random draws (and therefore the
+        # layout for a given seed) match a cell-by-cell scan of the grid.
 
-        for _, cell in enumerate(self.grid):
-            if cell.coordinate in border:
-                ObstacleAgent(self, cell)
+        # Create border obstacles
+        border = np.zeros((width, height), dtype=bool)
+        border[[0, -1], :] = True
+        border[:, [0, -1]] = True
+        self._create_at(ObstacleAgent, np.flatnonzero(border))
 
         # Agent placement logic
         if num_agents == 1:
@@ -46,6 +75,8 @@ class RandomModel(mesa.Model):
             # Divide grid into vertical zones
             usable_width = width - 2
             section_width = usable_width // num_agents
+            # Only the border is blocked while stations are being placed
+            free_cells = ~self.obstacle_mask
 
             for i in range(num_agents):
                 min_x = 1 + (i * section_width)
@@ -54,93 +85,133 @@ class RandomModel(mesa.Model):
                 max_y = height - 2
                 zone = (min_x, max_x, min_y, max_y)
 
-                available_zone_cells = []
-                for x in range(min_x, max_x + 1):
-                    for y in range(min_y, max_y + 1):
-                        cell = self.grid[(x, y)]
-                        if not any(isinstance(a, ObstacleAgent) for a in cell.agents):
-                            available_zone_cells.append(cell)
+                zone_free = free_cells[min_x:max_x + 1, min_y:max_y + 1]
+                zone_x, zone_y = np.nonzero(zone_free)
 
-                if available_zone_cells:
-                    station_cell = self.random.choice(available_zone_cells)
-                    station_pos = station_cell.coordinate
+                if len(zone_x):
+                    index = self.random.choice(range(len(zone_x)))
+                    station_pos = (int(zone_x[index]) + min_x, int(zone_y[index]) + min_y)
+                    station_cell = self.grid[station_pos]
                     StationAgent(self, station_cell)
                     RandomAgent(self, station_cell, home_station_pos=station_pos, zone=zone)
 
-        # Dirty tiles
-        available_cells = [cell for cell in self.grid.all_cells
-                           if not any(isinstance(a, (ObstacleAgent, StationAgent, RandomAgent))
-                                      for a in cell.agents)]
+        # Dirty tiles (Roombas always start on their station)
+        available_cells = np.flatnonzero(~self.obstacle_mask & ~self.station_mask)
 
         if len(available_cells) >= num_dirty_tiles:
-            dirty_cells = self.random.sample(available_cells, num_dirty_tiles)
-            for cell in dirty_cells:
-                FloorAgent(self, cell, is_clean=False)
+            picks = self.random.sample(range(len(available_cells)), num_dirty_tiles)
+            self._create_at(FloorAgent, available_cells[picks], is_clean=False)
 
         # Additional obstacles
-        available_cells = [cell for cell in self.grid.all_cells
-                           if not any(isinstance(a, (ObstacleAgent, StationAgent, RandomAgent, FloorAgent))
-                                      for a in cell.agents)]
+        available_cells = np.flatnonzero(~self.obstacle_mask & ~self.station_mask & ~self.dirty_mask)
 
         if len(available_cells) >= num_obstacles:
-            obstacle_cells = self.random.sample(available_cells, num_obstacles)
-            for cell in obstacle_cells:
-                ObstacleAgent(self, cell)
+            picks = self.random.sample(range(len(available_cells)), num_obstacles)
+            self._create_at(ObstacleAgent, available_cells[picks])
 
         self.running = True
 
-        # Track up to 10 Roombas
-        roombas = [agent for agent in self.agents
-                   if isinstance(agent, RandomAgent)]
-
-        self.roomba_ids = {}
-        for i, roomba in enumerate(roombas, 1):
-            self.roomba_ids[i] = roomba.unique_id
-
+        # The Solara page plots at least 10 "Roomba i" series; larger fleets
+        # get one series per robot. Each reporter is an O(1) slot lookup.
         model_reporters = {
             "Percentage Clean Tiles": lambda m: m.percentage_clean_tiles(),
+            "Roomba Movements": lambda m: m.get_all_roomba_movements(),
         }
 
-        for i in range(1, 10 + 1):
+        for i in range(1, max(10, len(self.roombas)) + 1):
             model_reporters[f"Roomba {i}"] = lambda m, idx=i: m.get_roomba_movements_by_index(idx)
 
         self.datacollector = mesa.DataCollector(model_reporters=model_reporters)
 
+        # "vectorized" steps the whole fleet from arrays, "agents" calls
+        # RandomAgent.step on every agent (the reference implementation)
+        self.fleet = FleetEngine(self) if engine == "vectorized" else None
+
+    def _create_at(self, agent_class, flat_cells, **kwargs):
+        """Create one agent_class per flat x * height + y index, in order."""
+        cells = [self.grid[divmod(int(flat), self.height)] for flat in flat_cells]
+        if cells:
+            agent_class.create_agents(self, len(cells), cells, **kwargs)
+
+    # --- layers ---
+    def set_obstacle(self, pos, blocked):
+        """Mark or clear an obstacle, invalidating cached fields and plans."""
+        self.obstacle_mask[pos] = blocked
+        self._station_fields.clear()
+        self._coverage_plans.clear()
+        self.layout_version += 1
+
+    def distance_to_station(self, station_pos):
+        """Obstacle-aware step distance from every cell to station_pos."""
+        field = self._station_fields.get(station_pos)
+        if field is None:
+            field = bfs_distance_field(self.obstacle_mask, station_pos)
+            self._station_fields[station_pos] = field
+        return field
+
+    def coverage_plan(self, zone, start):
+        """Boustrophedon coverage path of zone, computed once per layout."""
+        key = (zone, start)
+        plan = self._coverage_plans.get(key)
+        if plan is None:
+            plan = boustrophedon_plan(self.obstacle_mask, zone, start)
+            self._coverage_plans[key] = plan
+        return plan
+
+    def register_roomba(self, roomba):
+        """Give a Roomba the next slot and make room for its visit counts."""
+        slot = len(self.roombas)
+        self.roombas.append(roomba)
+        if slot >= len(self.visit_counts):
+            extra = np.zeros((slot + 1 - len(self.visit_counts), self.width, self.height),
+                             dtype=np.uint16)
+            self.visit_counts = np.concatenate([self.visit_counts, extra])
+        return slot
+
+    def visit_heatmap(self):
+        """Snapshot of visits per cell summed over all Roombas."""
+        return self.visit_counts[:len(self.roombas)].sum(axis=0, dtype=np.uint32)
+
     # --- metrics ---
     def count_active_roombas(self):
-        return sum(1 for agent in self.agents
-                   if isinstance(agent, RandomAgent) and agent.battery > 0)
+        return sum(1 for roomba in self.roombas if roomba.battery > 0)
 
     def get_roomba_movements(self, agent_id):
-        for agent in self.agents:
-            if isinstance(agent, RandomAgent) and agent.unique_id == agent_id:
-                return agent.movements
+        for roomba in self.roombas:
+            if roomba.unique_id == agent_id:
+                return roomba.movements
         return 0
 
     def get_roomba_movements_by_index(self, idx):
-        if idx in self.roomba_ids:
-            agent_id = self.roomba_ids[idx]
-            return self.get_roomba_movements(agent_id)
+        if 1 <= idx <= len(self.roombas):
+            return self.roombas[idx - 1].movements
         return 0
 
+    def get_all_roomba_movements(self):
+        """Movement counts of every Roomba, ordered by slot."""
+        return [roomba.movements for roomba in self.roombas]
+
     def count_dirty_tiles(self):
-        return sum(1 for agent in self.agents
-                   if isinstance(agent, FloorAgent) and not agent.fully_clean)
+        return self.dirty_tiles
 
     def count_clean_tiles(self):
-        return sum(1 for agent in self.agents
-                   if isinstance(agent, FloorAgent) and agent.fully_clean)
+        return self.clean_tiles
 
     def percentage_clean_tiles(self):
-        return (self.count_clean_tiles() /
-                (self.count_dirty_tiles() + self.count_clean_tiles())) * 100
+        total = self.dirty_tiles + self.clean_tiles
+        if total == 0:
+            return 100.0
+        return (self.clean_tiles / total) * 100
 
     def step(self):
-        self.agents.shuffle_do("step")
+        if self.fleet is not None:
+            self.fleet.step()
+        else:
+            self.agents.shuffle_do("step")
         self.datacollector.collect(self)
         self.steps_taken += 1
 
-        if self.count_dirty_tiles() == 0:
+        if self.dirty_tiles == 0:
             self.running = False
 
         if self.steps_taken >= self.max_steps:
@@ -0,0 +1,79 @@
+from collections import deque
+
+import numpy as np
+
+# Distance stored for obstacles and cells with no path to the source
+UNREACHABLE = np.iinfo(np.int32).max
+
+MOORE_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def bfs_distance_field(obstacle_mask, source):
+    """
+    Step distance from every cell to source over Moore neighbors.
+
+    The BFS grows one wavefront per distance with whole-array shifts, so
+    each ring costs a few NumPy operations instead of a Python loop over
+    cells. Obstacles and unreachable cells are set to UNREACHABLE.
+    """
+    free = ~obstacle_mask
+    distance = np.full(obstacle_mask.shape, UNREACHABLE, dtype=np.int32)
+    frontier = np.zeros(obstacle_mask.shape, dtype=bool)
+    frontier[source] = True
+    distance[source] = 0
+
+    step = 0
+    while frontier.any():
+        step += 1
+        # Moore dilation is separable: grow along x, then along y
+        grown = frontier.copy()
+        grown[1:, :] |= frontier[:-1, :]
+        grown[:-1, :] |= frontier[1:, :]
+        spread = grown.copy()
+        spread[:, 1:] |= grown[:, :-1]
+        spread[:, :-1] |= grown[:, 1:]
+
+        frontier = spread & free & (distance == UNREACHABLE)
+        distance[frontier] = step
+
+    return distance
+
+
+def is_adjacent(pos_a, pos_b):
+    """True if the two cells touch, diagonals included."""
+    return max(abs(pos_a[0] - pos_b[0]), abs(pos_a[1] - pos_b[1])) <= 1
+
+
+def shortest_path(blocked, start, goal):
+    """
+    Shortest Moore path from start to goal avoiding blocked cells.
+
+    Returns the list of cells including both ends, or None if goal can't
+    be reached. The search stops as soon as goal is found, so short
+    detours only touch the cells around them.
+    """
+    if start == goal:
+        return [start]
+
+    width, height = blocked.shape
+    parents = {start: None}
+    queue = deque([start])
+
+    while queue:
+        current = queue.popleft()
+        x, y = current
+        for dx, dy in MOORE_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if (nx, ny) in parents or not (0 <= nx < width and 0 <= ny < height):
+                continue
+            if blocked[nx, ny]:
+                continue
+            parents[(nx, ny)] = current
+            if (nx, ny) == goal:
+                path = [goal]
+                while path[-1] != start:
+                    path.append(parents[path[-1]])
+                return path[::-1]
+            queue.append((nx, ny))
+
+    return None
@@ -0,0 +1,45 @@
+import numpy as np
+
+from .pathing import UNREACHABLE, bfs_distance_field, is_adjacent, shortest_path
+
+
+def boustrophedon_plan(obstacle_mask, zone, start):
+    """
+    Coverage path for the cells of a zone reachable from start.
+
+    Sweeps the zone column by column (min_x to max_x), alternating up and
+    down, and stitches waypoints split by obstacles with the shortest
+    detour inside the zone. Consecutive cells of the returned tuple are
+    always neighbors, so a Roomba can follow it one cell per step.
+    Returns an empty tuple if start is not a free cell of the zone.
+    """
+    min_x, max_x, min_y, max_y = zone
+    local_start = (start[0] - min_x, start[1] - min_y)
+    region = obstacle_mask[min_x:max_x + 1, min_y:max_y + 1]
+    if not (0 <= local_start[0] < region.shape[0] and 0 <= local_start[1] < region.shape[1]):
+        return ()
+    if region[local_start]:
+        return ()
+
+    reachable = bfs_distance_field(region, local_start) != UNREACHABLE
+    blocked = ~reachable
+
+    waypoints = []
+    upwards = True
+    for x in range(region.shape[0]):
+        ys = np.flatnonzero(reachable[x])
+        if len(ys) == 0:
+            continue
+        if not upwards:
+            ys = ys[::-1]
+        waypoints.extend((x, int(y)) for y in ys)
+        upwards = not upwards
+
+    path = waypoints[:1]
+    for waypoint in waypoints[1:]:
+        if is_adjacent(path[-1], waypoint):
+            path.append(waypoint)
+        else:
+            path.extend(shortest_path(blocked, path[-1], waypoint)[1:])
+
+    return tuple((x + min_x, y + min_y) for x, y in path)
@@ -0,0 +1,30 @@
+import pytest
+
+from random_agents.fleet import compare_engines
+from random_agents.model import RandomModel
+
+SMALL_MAPS = [
+    dict(num_agents=1, seed=42),
+    dict(num_agents=3, num_obstacles=40, num_dirty_tiles=60, seed=7),
+    dict(num_agents=5, width=40, height=30, num_dirty_tiles=100, seed=3),
+]
+
+
+def roomba_states(model):
+    return [(roomba.cell.coordinate, roomba.battery) for roomba in model.roombas]
+
+
+@pytest.mark.parametrize("params", SMALL_MAPS)
+def test_clean_percentage_curves_match(params):
+    assert compare_engines(**params) is None
+
+
+@pytest.mark.parametrize("params", SMALL_MAPS)
+def test_positions_and_batteries_match(params):
+    reference = RandomModel(engine="agents", max_steps=300, **params)
+    fleet = RandomModel(engine="vectorized", max_steps=300, **params)
+    while reference.running:
+        reference.step()
+        fleet.step()
+        assert roomba_states(fleet) == roomba_states(reference), f"step {reference.steps_taken}"
+    assert not fleet.running
@@ -1,70 +1,4 @@
 from mesa import Agent
-import math
-
-def get_distance(pos_1, pos_2):
-    """ Get the distance between two point
-
-    Args:
-        pos_1, pos_2: Coordinate tuples for both points.
-
-    """
-    x1, y1 = pos_1
-    x2, y2 = pos_2
-    dx = x1 - x2
-    dy = y1 - y2
-    return math.sqrt(dx ** 2 + dy ** 2)
-
-class Environment(Agent):
-    """
-    A cell representing the Environment that will hold the chemical being
-    disbursed, and then reduce that amount through diffusion and evaporation.
-    """
-
-    def __init__(self, unique_id, pos, model):
-        """
-        Create a new cell.
-        Args:
-            unique_id: a unique value to distinguish the agent
-            pos: The cell's coordinates on the grid.
-            model: standard model reference for agent.
-        """
-        super().__init__(unique_id, model)
-        #self.pos = pos
-        self.amount = 0.0
-        self._nextAmount = 0.0
-
-    def step(self):
-        """
-        Find the sum of chemical in the neighboring environment, including this
-        cell, then set this cell to be the diffused and evaporated amount.
-        """
-        all_p = self.amount
-        neighbors = [n for n in self.model.grid.get_neighbors(self.pos, True) if type(n) is Environment]
-        for n in neighbors:
-            all_p += n.amount
-        ave_p = all_p / (len(neighbors) + 1)
-
-        self._nextAmount = (1 - self.model.evaporate) * \
-            (self.amount + (self.model.diffusion * \
-                                (ave_p - self.amount)))
-
-        if self._nextAmount < self.model.lowerbound:
-            self._nextAmount = 0.0
-
-    def advance(self):
-        """
-        Set the state to the new computed state -- computed in step().
-        """
-        self.amount = self._nextAmount
-
-    def add(self, amount):
-        """
-        Add the amount to the cell's amount
-        """
-        self.amount += amount
-
-    def get_pos(self):
-        return self.pos
 
 class Home(Agent):
     """
@@ -133,12 +67,9 @@ class Ant(Agent):
     # derived from Sugarscape get_sugar()
     def get_item(self, item):
         """
-        Finds the Agent of type item at this location in the Grid
+        Finds the Agent of type item (Food or Home) at this location in the Grid
         """
-        this_cell = self.model.grid.get_cell_list_contents([self.pos])
-        for agent in this_cell:
-            if type(agent) is item:
-                return agent
+        return self.model.item_at(item, self.pos)
 
     def step(self):
         """
@@ -177,10 +108,9 @@ class Ant(Agent):
 
     def drop_pheromone(self):
         """
-        Leave pheromone in the Environment and reduce the pheromone drop
+        Leave pheromone in the model's pheromone field and reduce the pheromone drop
         """
-        env = self.get_item(Environment)
-        env.add(self.drop)
+        self.model.add_pheromone(self.pos, self.drop)
         self.drop *= self.model.drop_rate
 
     # from wolf_sheep RandomWalker
@@ -197,31 +127,24 @@ class Ant(Agent):
     # adapted from Sugarscape
     def home_move(self):
         """
-        Step one cell toward self.home.pos.
+        Step one cell toward self.home.pos, choosing at random among the
+        neighbors closest to home (looked up in the model's homing table).
         """
-        # Get neighborhood within vision
-        neighbors = [n.get_pos() for n in self.model.grid.get_neighbors(self.pos, self.moore) if type(n) is Environment]
-
-        # Narrow down to the nearest ones to home
-        min_dist = min([get_distance(self.home.pos, pos) for pos in neighbors])
-        final_candidates = [
-            pos for pos in neighbors if get_distance(self.home.pos, pos) == min_dist
-        ]
-        self.random.shuffle(final_candidates)
-        self.model.grid.move_agent(self, final_candidates[0])
+        candidates = self.model.home_candidates(self.home.pos, self.pos, self.moore)
+        self.model.grid.move_agent(self, self.random.choice(candidates))
 
     def gradient_move(self):
         """
-        Step one cell to the pheromone gradient in the Environment
+        Step one cell to the pheromone gradient in the pheromone field
         """
-        # Find the neighbor Environment cell that has the highest pheromone amount
+        # Find the neighbor cell that has the highest pheromone amount
         where = (0, 0)
         maxp = self.model.lowerbound
-        neighbors = [n for n in self.model.grid.get_neighbors(self.pos, self.moore) if type(n) is Environment]
-        for n in neighbors:
-            if n.amount > maxp:
-                maxp = n.amount
-                where = n.get_pos()
+        pheromone = self.model.pheromone
+        for pos in self.model.grid.get_neighborhood(self.pos, self.moore):
+            if pheromone[pos] > maxp:
+                maxp = pheromone[pos]
+                where = pos
 
         # When something looks interesting, move there, otherwise randomly move
         if maxp > self.model.lowerbound:
@@ -0,0 +1,132 @@
+import numpy as np
+
+from agent import Food
+
+# Ant state codes
+FORAGING = 0
+HOMING = 1
+
+
+class Colony:
+    """
+    All the ants of an AntWorld held in NumPy arrays.
+
+    Positions, state codes and pheromone drop amounts live in one array
+    each, and every tick moves the whole colony with array operations,
+    following the same rules as Ant.step:
+
+    - A FORAGING ant on food eats one unit and starts HOMING. When more
+      ants than units are on a cache, a random subset of them eats.
+    - Other FORAGING ants move at random with probability prob_random,
+      otherwise up the pheromone gradient (falling back to a random move
+      when no neighbor is above lowerbound).
+    - A HOMING ant at home stores its food and goes back to FORAGING,
+      otherwise it drops pheromone and steps towards home using the
+      model's homing table.
+
+    Unlike the Ant agents, which act one after another, all ants decide
+    from the field as it was at the start of the tick and their
+    pheromone is added afterwards. Randomness comes from a NumPy
+    generator seeded from the model's random stream, so a seeded model
+    gives the same run every time.
+    """
+
+    def __init__(self, model, num_ants, offsets):
+        self.model = model
+        self.width, self.height = model.grid.width, model.grid.height
+        self.rng = np.random.default_rng(model.random.getrandbits(64))
+
+        home_x, home_y = model.home.pos
+        self.x = np.full(num_ants, home_x, dtype=np.int64)
+        self.y = np.full(num_ants, home_y, dtype=np.int64)
+        self.state = np.full(num_ants, FORAGING, dtype=np.int8)
+        self.drop = np.zeros(num_ants)
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        # Random moves may also stay in place, like get_neighborhood with
+        # include_center
+        self.random_offsets = np.vstack([self.offsets, [(0, 0)]])
+        self.homing_table = model.homing_table(model.home.pos, len(offsets) == 8)
+        # Set bits of every homing table entry, padded with -1
+        masks = np.arange(256)[:, None] >> np.arange(len(offsets)) & 1
+        self.bit_count = masks.sum(axis=1)
+        self.bit_index = np.full((256, len(offsets)), -1, dtype=np.int64)
+        for mask in range(256):
+            bits = np.flatnonzero(masks[mask])
+            self.bit_index[mask, :len(bits)] = bits
+
+        # Food left per cell, copied back onto the Food agents every tick
+        self.food = np.zeros((self.width, self.height), dtype=np.int64)
+        self.food_agents = dict(model.items[Food])
+        for pos, food in self.food_agents.items():
+            self.food[pos] = food.amount
+
+    def step(self):
+        model = self.model
+        x, y, state = self.x, self.y, self.state
+        home_x, home_y = model.home.pos
+
+        foraging = np.flatnonzero(state == FORAGING)
+        homing = np.flatnonzero(state == HOMING)
+
+        # Foraging ants standing on food: a random subset of each crowd eats
+        on_food = foraging[self.food[x[foraging], y[foraging]] > 0]
+        cells = x[on_food] * self.height + y[on_food]
+        order = np.lexsort((self.rng.random(len(on_food)), cells))
+        on_food, cells = on_food[order], cells[order]
+        first = np.searchsorted(cells, cells)
+        eaters = on_food[np.arange(len(on_food)) - first < self.food[x[on_food], y[on_food]]]
+        np.subtract.at(self.food, (x[eaters], y[eaters]), 1)
+
+        # Homing ants at home store their food, the rest drop pheromone
+        at_home = homing[(x[homing] == home_x) & (y[homing] == home_y)]
+        walkers = homing[(x[homing] != home_x) | (y[homing] != home_y)]
+        drops = (x[walkers], y[walkers], self.drop[walkers])
+
+        movers = np.setdiff1d(foraging, eaters, assume_unique=True)
+        new_x, new_y = self._forage_moves(movers)
+        home_x_next, home_y_next = self._home_moves(walkers)
+
+        state[eaters] = HOMING
+        self.drop[eaters] = model.initdrop
+        state[at_home] = FORAGING
+        self.drop[at_home] = 0
+        self.drop[walkers] *= model.drop_rate
+        x[movers], y[movers] = new_x, new_y
+        x[walkers], y[walkers] = home_x_next, home_y_next
+
+        drop_x, drop_y, amounts = drops
+        np.add.at(model.pheromone, (drop_x, drop_y), amounts)
+        model.active_tiles[drop_x // model.tile_size, drop_y // model.tile_size] = True
+
+        model.home.add(len(at_home))
+        for pos, food in self.food_agents.items():
+            food.amount = int(self.food[pos])
+
+    def _forage_moves(self, movers):
+        """Random or gradient moves for the foraging ants that didn't eat."""
+        x, y = self.x[movers], self.y[movers]
+        model = self.model
+
+        # Pheromone of every neighbor; the first maximum wins, as in
+        # Ant.gradient_move
+        nx = (x[:, None] + self.offsets[:, 0]) % self.width
+        ny = (y[:, None] + self.offsets[:, 1]) % self.height
+        scent = model.pheromone[nx, ny]
+        best = np.argmax(scent, axis=1)
+        rows = np.arange(len(movers))
+        smells = scent[rows, best] > model.lowerbound
+
+        wander = (self.rng.random(len(movers)) < model.prob_random) | ~smells
+        step = self.random_offsets[self.rng.integers(len(self.random_offsets), size=len(movers))]
+        new_x = np.where(wander, (x + step[:, 0]) % self.width, nx[rows, best])
+        new_y = np.where(wander, (y + step[:, 1]) % self.height, ny[rows, best])
+        return new_x, new_y
+
+    def _home_moves(self, walkers):
+        """One step towards home, at random among the closest neighbors."""
+        x, y = self.x[walkers], self.y[walkers]
+        masks = self.homing_table[x, y]
+        pick = (self.rng.random(len(walkers)) * self.bit_count[masks]).astype(np.int64)
+        offsets = self.offsets[self.bit_index[masks, pick]]
+        return (x + offsets[:, 0]) % self.width, (y + offsets[:, 1]) % self.height
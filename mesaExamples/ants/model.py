@@ -1,17 +1,41 @@
+import numpy as np
 from mesa import Model
-from mesa.time import SimultaneousActivation
+from mesa.time import BaseScheduler
 from mesa.space import MultiGrid
 
-from agent import Environment, Ant, Food, Home
+from agent import Ant, Food, Home
+from colony import Colony
+
+# Neighbor offsets; bit i of a homing table entry stands for offsets[i]
+MOORE_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+VON_NEUMANN_OFFSETS = ((-1, 0), (0, -1), (0, 1), (1, 0))
+
+# Default food caches
+FOOD_LOCS = ((22, 11), (35, 8), (18, 33))
 
 class AntWorld(Model):
     """
     Represents the ants foraging for food.
     """
 
-    def __init__(self, height=50, width=50, evaporate=0.5, diffusion=1, initdrop=100, lowerbound=0.01, prob_random=0.1, drop_rate=0.9):
+    def __init__(self, height=50, width=50, evaporate=0.5, diffusion=1, initdrop=100, lowerbound=0.01, prob_random=0.1, drop_rate=0.9,
+                 diffusion_mode="dense", tile_size=32, num_ants=100, food_locs=FOOD_LOCS, food_amount=100,
+                 engine="agents", seed=None):
         """
         Create a new playing area of (height, width) cells.
+
+        Args:
+            diffusion_mode: "dense" diffuses the whole pheromone field every
+                step, "sparse" only the tiles that hold pheromone and their
+                neighbors. Both give the same field.
+            tile_size: Side of the square tiles tracked in sparse mode.
+            num_ants: Number of ants, all starting at home.
+            food_locs: Positions of the food caches.
+            food_amount: Food units in each cache.
+            engine: "agents" steps one Ant agent per ant, "colony" moves
+                all the ants at once from arrays (see colony.Colony), so
+                no Ant agents are created.
+            seed: Seed for the model's random number generator.
         """
         print("Making World")
         super().__init__()
@@ -21,54 +45,214 @@ class AntWorld(Model):
         self.lowerbound = lowerbound
         self.prob_random = prob_random
         self.drop_rate = drop_rate
+        if diffusion_mode not in ("dense", "sparse"):
+            raise ValueError("diffusion_mode must be 'dense' or 'sparse'")
+        self.diffusion_mode = diffusion_mode
+        self.tile_size = tile_size
+        if engine not in ("agents", "colony"):
+            raise ValueError("engine must be 'agents' or 'colony'")
+        self.engine = engine
 
         # Set up the grid and schedule.
 
-        # Use SimultaneousActivation which simulates all the cells
-        # computing their next state simultaneously.  This needs to
-        # be done because each cell's next state depends on the current
-        # state of all its neighbors -- before they've changed.
-        self.schedule = SimultaneousActivation(self)
+        # Only the ants, food and home are agents, stepped in the order
+        # they were added. The pheromone lives in an array (see diffuse).
+        self.schedule = BaseScheduler(self)
 
         # Use a simple grid, where edges wrap around.
         self.grid = MultiGrid(height, width, torus=True)
 
-        # Define pos for the initial home and food locations
+        # Pheromone amount per cell, indexed as [x, y] like grid positions
+        self.pheromone = np.zeros((self.grid.width, self.grid.height))
+        # Homing tables per (home position, moore), see home_candidates
+        self.homing_tables = {}
+        # Food and Home agents by position, see item_at
+        self.items = {Food: {}, Home: {}}
+
+        # Tiles that may hold pheromone, see add_pheromone and diffuse_sparse
+        self.active_tiles = np.zeros((-(-self.grid.width // tile_size), -(-self.grid.height // tile_size)), dtype=bool)
+
+        # Define pos for the initial home location
         homeloc = (25, 25)
-        food_locs = ((22, 11), (35, 8), (18, 33))
 
         self.home = Home(self.next_id(), homeloc, self)
-        self.grid.place_agent(self.home, homeloc)
-        self.schedule.add(self.home)
+        self.place_item(self.home, homeloc)
 
         # Add in the ants
-        # Need to do this first, or it won't affect the cells, consequence of SimultaneousActivation
-        for i in range(100):
-            ant = Ant(self.next_id(), self.home, self)
-            self.grid.place_agent(ant, self.home.pos)
-            self.schedule.add(ant)
+        self.colony = None
+        if engine == "agents":
+            for i in range(num_ants):
+                ant = Ant(self.next_id(), self.home, self)
+                self.grid.place_agent(ant, self.home.pos)
+                self.schedule.add(ant)
 
         # Add the food locations
         for loc in food_locs:
             food = Food(self.next_id(), self)
-            food.add(100)
-            self.grid.place_agent(food, loc)
-            self.schedule.add(food)
+            food.add(food_amount)
+            self.place_item(food, loc)
+        self.total_food = food_amount * len(food_locs)
 
-        # Place an environment cell at each location
-        for contents, (x, y) in self.grid.coord_iter():
-            cell = Environment(self.next_id(), (x, y), self)
-            self.grid.place_agent(cell, (x, y))
-            self.schedule.add(cell)
+        if engine == "colony":
+            self.colony = Colony(self, num_ants, MOORE_OFFSETS)
 
         self.running = True
 
-    def step(self):
+    def place_item(self, agent, pos):
+        """
+        Place a Food or Home agent, schedule it and index it by position
+        """
+        self.grid.place_agent(agent, pos)
+        self.schedule.add(agent)
+        self.items[type(agent)][pos] = agent
+
+    def item_at(self, item, pos):
+        """
+        The agent of type item (Food or Home) at pos, or None.
+
+        Food and homes never move, so a dict per type answers this without
+        looking at the ants piled up on the same cell.
+        """
+        return self.items[item].get(pos)
+
+    def homing_table(self, home_pos, moore=True):
+        """
+        Bitmask per cell of the neighbor offsets that end closest to home_pos.
+
+        Distances are measured across the torus edges. The table is built
+        once per nest with whole-array operations and then cached, so any
+        number of nests can share the model.
+        """
+        key = (home_pos, moore)
+        if key not in self.homing_tables:
+            offsets = MOORE_OFFSETS if moore else VON_NEUMANN_OFFSETS
+            width, height = self.grid.width, self.grid.height
+            xs, ys = np.meshgrid(np.arange(width), np.arange(height), indexing="ij")
+
+            # Squared torus distance to home after each move, kept integral
+            # so ties are exact
+            distances = []
+            for dx, dy in offsets:
+                ax = np.abs((xs + dx) % width - home_pos[0])
+                ay = np.abs((ys + dy) % height - home_pos[1])
+                ax = np.minimum(ax, width - ax)
+                ay = np.minimum(ay, height - ay)
+                distances.append(ax ** 2 + ay ** 2)
+            distances = np.stack(distances)
+
+            best = distances == distances.min(axis=0)
+            bits = (1 << np.arange(len(offsets), dtype=np.uint8))[:, None, None]
+            self.homing_tables[key] = (best * bits).sum(axis=0).astype(np.uint8)
+        return self.homing_tables[key]
+
+    def home_candidates(self, home_pos, pos, moore=True):
+        """
+        Neighbors of pos that get closest to home_pos, from the homing table
+        """
+        offsets = MOORE_OFFSETS if moore else VON_NEUMANN_OFFSETS
+        mask = self.homing_table(home_pos, moore)[pos]
+        x, y = pos
+        return [
+            ((x + dx) % self.grid.width, (y + dy) % self.grid.height)
+            for i, (dx, dy) in enumerate(offsets) if mask >> i & 1
+        ]
+
+    def add_pheromone(self, pos, amount):
+        """
+        Add pheromone to a cell and mark its tile as active
         """
-        Have the scheduler advance each cell by one step
+        self.pheromone[pos] += amount
+        self.active_tiles[pos[0] // self.tile_size, pos[1] // self.tile_size] = True
+
+    def diffuse(self):
         """
+        Diffuse and evaporate the whole pheromone field at once.
+
+        Every cell moves towards the average of itself and its 8 neighbors
+        (wrapping around the torus), then evaporates. Amounts that end up
+        below lowerbound are cleared to 0.
+        """
+        field = self.pheromone
+        # The 3x3 box sum is separable: sum along x, then along y
+        rows = field + np.roll(field, 1, axis=0) + np.roll(field, -1, axis=0)
+        average = (rows + np.roll(rows, 1, axis=1) + np.roll(rows, -1, axis=1)) / 9
+
+        field = (1 - self.evaporate) * (field + self.diffusion * (average - field))
+        field[field < self.lowerbound] = 0.0
+        self.pheromone = field
+
+        # Any tile with pheromone left stays active
+        size = self.tile_size
+        nonzero = field != 0
+        nonzero = np.logical_or.reduceat(nonzero, np.arange(0, field.shape[0], size), axis=0)
+        self.active_tiles = np.logical_or.reduceat(nonzero, np.arange(0, field.shape[1], size), axis=1)
+
+    def diffuse_sparse(self):
+        """
+        Diffuse only the active tiles of the pheromone field.
+
+        Pheromone spreads one cell per step, so only active tiles and the
+        tiles around them can change; everything else is 0 and stays 0.
+        Those tiles are gathered with a one-cell halo (wrapping around the
+        torus), updated with the same arithmetic as diffuse, and written
+        back in place. Cost follows the trail area, not the map area.
+        Falls back to diffuse when most of the map is active.
+        """
+        field = self.pheromone
+        width, height = field.shape
+        size = self.tile_size
+
+        grown = self.active_tiles | np.roll(self.active_tiles, 1, axis=0) | np.roll(self.active_tiles, -1, axis=0)
+        grown = grown | np.roll(grown, 1, axis=1) | np.roll(grown, -1, axis=1)
+        if not grown.any():
+            return
+        if grown.mean() > 0.5:
+            self.diffuse()
+            return
+
+        tile_x, tile_y = np.nonzero(grown)
+        # Windows of (size + 2) x (size + 2) cells; a partial last tile just
+        # wraps onto cells of the first one, which get the same values
+        offsets = np.arange(-1, size + 1)
+        xs = (tile_x[:, None] * size + offsets) % width
+        ys = (tile_y[:, None] * size + offsets) % height
+        window = field[xs[:, :, None], ys[:, None, :]]
+
+        center = window[:, 1:-1, 1:-1]
+        rows = window[:, 1:-1, :] + window[:, :-2, :] + window[:, 2:, :]
+        average = (rows[:, :, 1:-1] + rows[:, :, :-2] + rows[:, :, 2:]) / 9
+
+        tiles = (1 - self.evaporate) * (center + self.diffusion * (average - center))
+        tiles[tiles < self.lowerbound] = 0.0
+        field[xs[:, 1:-1, None], ys[:, None, 1:-1]] = tiles
+
+        self.active_tiles = np.zeros_like(grown)
+        self.active_tiles[tile_x, tile_y] = tiles.reshape(len(tiles), -1).any(axis=1)
+
+    def move_ants(self):
+        """
+        Have the scheduler (or the colony) advance the ants by one step
+        """
+        if self.colony is not None:
+            self.colony.step()
         self.schedule.step()
 
+    def spread_pheromone(self):
+        """
+        Diffuse and evaporate the pheromone with the configured diffusion mode
+        """
+        if self.diffusion_mode == "sparse":
+            self.diffuse_sparse()
+        else:
+            self.diffuse()
+
+    def step(self):
+        """
+        Advance the ants by one step, then diffuse the pheromone
+        """
+        self.move_ants()
+        self.spread_pheromone()
+
         # stop when all the food is collected
-        if self.home.amount == 300:
+        if self.home.amount == self.total_food:
             self.running = False
@@ -0,0 +1,81 @@
+// CanvasModule that paints the pheromone raster sent by PheromoneCanvasGrid
+// (one byte of red per cell, base64, top row first) and then draws the
+// agent layers on top of it with the regular GridVisualization.
+const PheromoneModule = function (
+  canvas_width,
+  canvas_height,
+  grid_width,
+  grid_height
+) {
+  const createElement = (tagName, attrs) => {
+    const element = document.createElement(tagName);
+    Object.assign(element, attrs);
+    return element;
+  };
+
+  const parent = createElement("div", {
+    style: `height:${canvas_height}px;`,
+    className: "world-grid-parent",
+  });
+  const createCanvas = () =>
+    createElement("canvas", {
+      width: canvas_width,
+      height: canvas_height,
+      className: "world-grid",
+    });
+  const canvas = createCanvas();
+  const interaction_canvas = createCanvas();
+  parent.appendChild(canvas);
+  parent.appendChild(interaction_canvas);
+  document.getElementById("elements").appendChild(parent);
+
+  const context = canvas.getContext("2d");
+  const interactionHandler = new InteractionHandler(
+    canvas_width,
+    canvas_height,
+    grid_width,
+    grid_height,
+    interaction_canvas.getContext("2d")
+  );
+  const canvasDraw = new GridVisualization(
+    canvas_width,
+    canvas_height,
+    grid_width,
+    grid_height,
+    context,
+    interactionHandler
+  );
+
+  // One pixel per cell, scaled up to the cell size when drawn
+  const raster = createElement("canvas", { width: grid_width, height: grid_height });
+  const rasterContext = raster.getContext("2d");
+  const image = rasterContext.createImageData(grid_width, grid_height);
+  const cellWidth = Math.floor(canvas_width / grid_width);
+  const cellHeight = Math.floor(canvas_height / grid_height);
+
+  const drawPheromone = (encoded) => {
+    const red = atob(encoded);
+    const pixels = image.data;
+    for (let i = 0; i < red.length; i++) {
+      const shade = 255 - red.charCodeAt(i);
+      pixels[4 * i] = 255;
+      pixels[4 * i + 1] = shade;
+      pixels[4 * i + 2] = shade;
+      pixels[4 * i + 3] = 255;
+    }
+    rasterContext.putImageData(image, 0, 0);
+    context.imageSmoothingEnabled = false;
+    context.drawImage(raster, 0, 0, cellWidth * grid_width, cellHeight * grid_height);
+  };
+
+  this.render = (data) => {
+    canvasDraw.resetCanvas();
+    drawPheromone(data.pheromone);
+    for (const layer in data.layers) canvasDraw.drawLayer(data.layers[layer]);
+    canvasDraw.drawGridLines("#eee");
+  };
+
+  this.reset = () => {
+    canvasDraw.resetCanvas();
+  };
+};
@@ -0,0 +1,147 @@
+"""
+Headless runs of the ants model.
+
+Runs AntWorld until all the food is home (or --max-steps) for every
+combination of the given parameters, in a process pool, and writes one
+row per run with the steps to harvest, wall-clock time split into ant
+movement and pheromone diffusion, and peak traced memory. Only the model
+is imported, so no visualization server is started.
+
+Example:
+    python run.py --evaporate 0.2 0.5 --diffusion 0.5 1 --drop-rate 0.9 \\
+        --prob-random 0.05 0.1 --replicates 5 --out ants_sweep.csv
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+from model import AntWorld
+
+PARAMS = ["evaporate", "diffusion", "drop_rate", "prob_random", "num_ants",
+          "width", "height", "engine", "diffusion_mode", "seed"]
+FIELDS = PARAMS + [
+    "max_steps", "steps", "steps_to_harvest", "food_home", "total_food",
+    "seconds", "move_seconds", "diffuse_seconds", "peak_memory_bytes",
+]
+
+
+def make_model(params):
+    # AntWorld announces itself on stdout, keep the output clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        return AntWorld(**params)
+
+
+def timed_run(params, max_steps):
+    """Run one model until harvested or max_steps, timing each phase."""
+    model = make_model(params)
+    move = diffuse = 0.0
+    steps = 0
+    while model.home.amount < model.total_food and steps < max_steps:
+        start = time.perf_counter()
+        model.move_ants()
+        middle = time.perf_counter()
+        model.spread_pheromone()
+        diffuse += time.perf_counter() - middle
+        move += middle - start
+        steps += 1
+    return model, steps, move, diffuse
+
+
+def run_one(config):
+    """Run a single configuration and return its summary row."""
+    params, max_steps, memory = config
+    model, steps, move, diffuse = timed_run(params, max_steps)
+
+    row = dict(params)
+    row["max_steps"] = max_steps
+    row["steps"] = steps
+    row["steps_to_harvest"] = steps if model.home.amount >= model.total_food else None
+    row["food_home"] = model.home.amount
+    row["total_food"] = model.total_food
+    row["seconds"] = move + diffuse
+    row["move_seconds"] = move
+    row["diffuse_seconds"] = diffuse
+    row["peak_memory_bytes"] = None
+
+    if memory:
+        # Measured in a separate pass, tracemalloc slows everything down
+        tracemalloc.start()
+        timed_run(params, max_steps)
+        _, row["peak_memory_bytes"] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return row
+
+
+def build_configs(args):
+    seeds = args.seeds if args.seeds else range(args.base_seed, args.base_seed + args.replicates)
+    for evaporate, diffusion, drop_rate, prob_random, seed in itertools.product(
+            args.evaporate, args.diffusion, args.drop_rate, args.prob_random, seeds):
+        params = {
+            "evaporate": evaporate,
+            "diffusion": diffusion,
+            "drop_rate": drop_rate,
+            "prob_random": prob_random,
+            "num_ants": args.num_ants,
+            "width": args.size,
+            "height": args.size,
+            "engine": args.engine,
+            "diffusion_mode": args.diffusion_mode,
+            "seed": seed,
+        }
+        yield params, args.max_steps, not args.skip_memory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless runs of the ants model.")
+    parser.add_argument("--evaporate", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--diffusion", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--drop-rate", type=float, nargs="+", default=[0.9])
+    parser.add_argument("--prob-random", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--num-ants", type=int, default=100)
+    parser.add_argument("--size", type=int, default=50, help="side of the square world")
+    parser.add_argument("--engine", choices=["agents", "colony"], default="agents")
+    parser.add_argument("--diffusion-mode", choices=["dense", "sparse"], default="dense")
+    parser.add_argument("--seeds", type=int, nargs="+",
+                        help="explicit seeds (overrides --replicates/--base-seed)")
+    parser.add_argument("--replicates", type=int, default=1)
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--skip-memory", action="store_true",
+                        help="don't rerun each configuration to measure peak memory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", help="CSV file for the results (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w", newline="") if args.out else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    done = 0
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for row in pool.imap_unordered(run_one, build_configs(args)):
+                writer.writerow(row)
+                out.flush()
+                done += 1
+                harvest = "harvested" if row["steps_to_harvest"] is not None else "not harvested"
+                print(f"evaporate={row['evaporate']} diffusion={row['diffusion']} "
+                      f"drop_rate={row['drop_rate']} prob_random={row['prob_random']} "
+                      f"seed={row['seed']}: {harvest} after {row['steps']} steps, "
+                      f"{row['seconds']:.2f}s (move {row['move_seconds']:.2f}s, "
+                      f"diffuse {row['diffuse_seconds']:.2f}s)", file=sys.stderr)
+    finally:
+        if args.out:
+            out.close()
+
+    print(f"{done} runs finished", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,13 @@ from mesa.visualization.ModularVisualization import ModularServer
 from mesa.visualization import Slider
 
 from model import AntWorld
-from agent import Environment, Ant, Food, Home
+from agent import Ant, Food, Home
+from collections import defaultdict
+import base64
 import math
+import os
+
+import numpy as np
 
 
 def log_norm(value, lower, upper):
@@ -15,17 +20,18 @@ def log_norm(value, lower, upper):
     https://matplotlib.org/3.1.1/api/_as_gen/matplotlib.colors.LogNorm.html
 
     Args:
-        value: The value to be calibrated.
+        value: The value (or NumPy array of values) to be calibrated.
         lower: The lower bound of the range
         upper: The upper bound of the range
 
     """
-    value = min(value, upper)
-    value = max(value, lower)
+    value = np.clip(value, lower, upper)
     lower_log = math.log(lower)
     upper_log = math.log(upper)
-    value_log = math.log(value)
-    return (value_log - lower_log) / (upper_log - lower_log)
+    return (np.log(value) - lower_log) / (upper_log - lower_log)
+
+def ant_portrayal():
+    return {"Shape": "resources/ant.png", "scale": 0.9, "Layer": 1}
 
 def diffusion_portrayal(agent):
     if agent is None:
@@ -33,9 +39,7 @@ def diffusion_portrayal(agent):
 
     portrayal = {}
     if type(agent) is Ant:
-        portrayal["Shape"] = "resources/ant.png"
-        portrayal["scale"] = 0.9
-        portrayal["Layer"] = 1
+        portrayal = ant_portrayal()
     elif type(agent) is Food:
         portrayal["Shape"] = "circle"
         portrayal["r"] = math.log(1 + agent.amount)
@@ -52,24 +56,62 @@ def diffusion_portrayal(agent):
         portrayal["Color"] = "#964B00BB"
         portrayal["text"] = agent.amount
         portrayal["text_color"] = "white"
-    elif type(agent) is Environment:
-        portrayal["Shape"] = "rect"
-        portrayal["Filled"] = "true"
-        portrayal["Layer"] = 0
-        portrayal["w"] = 1
-        portrayal["h"] = 1
 
-        # Calculate the amount of red we want
-        red = int(log_norm(agent.amount, agent.model.lowerbound, agent.model.initdrop) * 255)
+    return portrayal
+
+def pheromone_raster(model):
+    """
+    Amount of red of every cell of the pheromone field, from 0 (white) to
+    255 (red), as one byte per cell in base64.
 
-        # Scale this between red and white
-        # cite https://stackoverflow.com/questions/3380726/converting-a-rgb-color-tuple-to-a-six-digit-code-in-python
-        portrayal["Color"] = '#FF%02x%02x' % (255 - red, 255 - red)
+    Rows run from the top of the canvas down, so row 0 is the highest y.
+    """
+    red = (log_norm(model.pheromone, model.lowerbound, model.initdrop) * 255).astype(np.uint8)
+    return base64.b64encode(red.T[::-1].tobytes()).decode("ascii")
 
-    return portrayal
+class PheromoneCanvasGrid(CanvasGrid):
+    """
+    CanvasGrid that draws the model's pheromone array under the agents.
+
+    The whole field goes to the browser as a single raster (see
+    pheromone_raster), painted by resources/PheromoneModule.js, and only
+    the food, the nest and one ant per occupied cell are sent as
+    portrayals on top of it.
+    """
+    local_includes = ["resources/PheromoneModule.js"]
+    local_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, portrayal_method, grid_width, grid_height, canvas_width=500, canvas_height=500):
+        super().__init__(portrayal_method, grid_width, grid_height, canvas_width, canvas_height)
+        self.js_code = "elements.push(new PheromoneModule({}, {}, {}, {}));".format(
+            canvas_width, canvas_height, grid_width, grid_height
+        )
+
+    def render(self, model):
+        grid_state = defaultdict(list)
+
+        def add(portrayal, pos):
+            if portrayal:
+                portrayal["x"], portrayal["y"] = int(pos[0]), int(pos[1])
+                grid_state[portrayal["Layer"]].append(portrayal)
+
+        # Ants piled on a cell all look the same, draw one per cell
+        if model.colony is not None:
+            colony = model.colony
+            cells = np.unique(colony.x * model.grid.height + colony.y)
+            ant_cells = zip(*np.divmod(cells, model.grid.height))
+        else:
+            ant_cells = {agent.pos for agent in model.schedule.agents if type(agent) is Ant}
+        for pos in ant_cells:
+            add(ant_portrayal(), pos)
+        for items in model.items.values():
+            for pos, agent in items.items():
+                add(self.portrayal_method(agent), pos)
+
+        return {"pheromone": pheromone_raster(model), "layers": grid_state}
 
 # Make a world that is 50x50, on a 500x500 display.
-canvas_element = CanvasGrid(diffusion_portrayal, 50, 50, 500, 500)
+canvas_element = PheromoneCanvasGrid(diffusion_portrayal, 50, 50, 500, 500)
 
 model_params = {
     "height": 50,
@@ -1,16 +1,33 @@
 from mesa.discrete_space import FixedAgent
 
+# Codes of the cells in ForestFire.conditions
+EMPTY = 0
+FINE = 1
+ON_FIRE = 2
+BURNED_OUT = 3
+CONDITIONS = {FINE: "Fine", ON_FIRE: "On Fire", BURNED_OUT: "Burned Out"}
+CODES = {condition: code for code, condition in CONDITIONS.items()}
+
 class TreeCell(FixedAgent):
     """A tree cell.
 
     Attributes:
-        condition: Can be "Fine", "On Fire", or "Burned Out"
+        condition: Can be "Fine", "On Fire", or "Burned Out". Stored as a
+            code in the model's conditions array, this is only a view on it.
 
     """
     @property
     def neighbors(self):
         return self.cell.neighborhood.agents
 
+    @property
+    def condition(self):
+        return CONDITIONS[self.model.conditions[self.pos]]
+
+    @condition.setter
+    def condition(self, condition):
+        self.model.set_condition(self.pos, CODES[condition])
+
     def __init__(self, model, cell):
         """Create a new tree.
 
@@ -18,9 +35,9 @@ class TreeCell(FixedAgent):
             model: standard model reference for agent.
         """
         super().__init__(model)
-        self.condition = "Fine"
         self.cell = cell
         self.pos = cell.coordinate
+        self.condition = "Fine"
 
     def step(self):
         """If the tree is on fire, spread it to fine trees nearby."""
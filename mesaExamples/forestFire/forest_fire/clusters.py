@@ -0,0 +1,91 @@
+import numpy as np
+
+# Half of the Moore offsets; the other half are the same links reversed
+HALF_MOORE_OFFSETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def _shift_pairs(width, height, dx, dy, torus):
+    """Flat indices (a, b) of every pair of cells b = a + (dx, dy)."""
+    xs, ys = np.meshgrid(np.arange(width), np.arange(height), indexing="ij")
+    nx, ny = xs + dx, ys + dy
+    if torus:
+        nx, ny = nx % width, ny % height
+        inside = np.ones(xs.shape, dtype=bool)
+    else:
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+    return (xs * height + ys)[inside], (nx * height + ny)[inside]
+
+
+def label_clusters(trees, torus=False):
+    """
+    Label the Moore-connected clusters of a boolean tree mask.
+
+    Returns an int64 array shaped like trees where every tree holds the
+    flat index (x * height + y) of the lowest cell of its cluster, and
+    empty cells hold -1.
+
+    Union-find run on whole arrays: every round hooks the higher root of
+    each linked pair of trees under the lower one, then compresses all
+    paths by pointer jumping, until no link joins two different roots.
+    """
+    width, height = trees.shape
+    flat = trees.ravel()
+    parent = np.arange(flat.size)
+
+    links = [_shift_pairs(width, height, dx, dy, torus) for dx, dy in HALF_MOORE_OFFSETS]
+    a = np.concatenate([a for a, _ in links])
+    b = np.concatenate([b for _, b in links])
+    keep = flat[a] & flat[b]
+    a, b = a[keep], b[keep]
+
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        split = root_a != root_b
+        if not split.any():
+            break
+        low = np.minimum(root_a[split], root_b[split])
+        high = np.maximum(root_a[split], root_b[split])
+        np.minimum.at(parent, high, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    return np.where(flat, parent, -1).reshape(width, height)
+
+
+def burn_depths(trees, seeds, torus=False):
+    """
+    Moore BFS depth of every tree from the seed trees, through trees only.
+
+    Seeds are at depth 0; empty cells and trees the fire can't reach are
+    -1. Each level expands the whole wavefront at once as index arrays,
+    so the total work follows the number of trees, not levels x area.
+    """
+    width, height = trees.shape
+    offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy])
+    depth = np.full(trees.shape, -1, dtype=np.int64)
+    unseen = trees.copy()
+
+    xs, ys = np.nonzero(seeds & trees)
+    depth[xs, ys] = 0
+    unseen[xs, ys] = False
+
+    level = 0
+    while len(xs):
+        level += 1
+        nx = (xs[:, None] + offsets[:, 0]).ravel()
+        ny = (ys[:, None] + offsets[:, 1]).ravel()
+        if torus:
+            nx, ny = nx % width, ny % height
+        else:
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+            nx, ny = nx[inside], ny[inside]
+        new = unseen[nx, ny]
+        cells = np.unique(nx[new] * height + ny[new])
+        xs, ys = np.divmod(cells, height)
+        depth[xs, ys] = level
+        unseen[xs, ys] = False
+
+    return depth
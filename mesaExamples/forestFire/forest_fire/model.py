@@ -1,21 +1,34 @@
 import mesa
+import numpy as np
 from mesa.discrete_space import OrthogonalMooreGrid
 
-from .agent import TreeCell
+from .agent import CODES, EMPTY, TreeCell
+from .clusters import burn_depths, label_clusters
+from .frontier import FireFront
 
 class ForestFire(mesa.Model):
     """Simple Forest Fire model."""
 
-    def __init__(self, width=100, height=100, density=0.65, seed=None):
+    def __init__(self, width=100, height=100, density=0.65, seed=None, engine="agents"):
         """Create a new forest fire model.
 
         Args:
             width, height: The size of the grid to model
             density: What fraction of grid cells have a tree in them.
+            engine: "agents" steps every tree each tick, "frontier" only the
+                trees on fire (see frontier.FireFront).
         """
         super().__init__(seed=seed)
+        if engine not in ("agents", "frontier"):
+            raise ValueError(f"Unknown engine {engine!r}, expected 'agents' or 'frontier'")
+        self.engine = engine
 
         self.grid = OrthogonalMooreGrid((width, height), capacity=1, random=self.random)
+        # Condition code of every cell (see agent.py), and how many cells
+        # hold each code, kept up to date by set_condition
+        self.conditions = np.full((width, height), EMPTY, dtype=np.int8)
+        self.condition_counts = [0] * (max(CODES.values()) + 1)
+        self.condition_counts[EMPTY] = width * height
         self.datacollector = mesa.DataCollector(
             {
                 "Fine": lambda m: self.count_type(m, "Fine"),
@@ -33,20 +46,62 @@ class ForestFire(mesa.Model):
                 if cell.coordinate[0] == 0:
                     new_tree.condition = "On Fire"
 
+        self.front = None
+        if engine == "frontier":
+            self.front = FireFront(self.conditions, self.random, self.grid.torus, self.condition_counts)
+
         self.running = True
         self.datacollector.collect(self)
 
     def step(self):
         """Advance the model by one step."""
-        self.agents.shuffle_do("step")
+        if self.front is not None:
+            self.front.step()
+        else:
+            self.agents.shuffle_do("step")
         # collect data
         self.datacollector.collect(self)
 
         # Halt if no more fire
-        if self.count_type(self, "On Fire") == 0:
+        if self.front is not None:
+            self.running = bool(self.front)
+        elif self.count_type(self, "On Fire") == 0:
             self.running = False
 
+    def set_condition(self, pos, code):
+        """Set the condition code of the cell at pos, keeping the counts."""
+        counts = self.condition_counts
+        counts[self.conditions[pos]] -= 1
+        counts[code] += 1
+        self.conditions[pos] = code
+
+    def tree_clusters(self):
+        """Moore-connected clusters of trees, see clusters.label_clusters."""
+        return label_clusters(self.conditions != EMPTY, self.grid.torus)
+
+    def predict_burn(self):
+        """Predict how the fire started in the first column ends, without stepping.
+
+        The fire burns exactly the tree clusters that touch the first column.
+        A tree at BFS depth d from the first column catches fire after at most
+        d steps, sooner when the trees along the way happen to act in order,
+        so the fire is out after at most the largest depth + 1 steps.
+
+        Returns:
+            The boolean mask of trees that end up burned, and that bound on
+            the number of steps the fire lasts.
+        """
+        trees = self.conditions != EMPTY
+        labels = self.tree_clusters()
+        burning = np.unique(labels[0][labels[0] >= 0])
+        burned = np.isin(labels, burning)
+
+        seeds = np.zeros_like(trees)
+        seeds[0] = trees[0]
+        depth = burn_depths(trees, seeds, self.grid.torus)
+        return burned, int(depth.max()) + 1 if burned.any() else 0
+
     @staticmethod
     def count_type(model, tree_condition):
         """Helper method to count trees in a given condition in a given model."""
-        return len(model.agents.select(lambda x: x.condition == tree_condition))
+        return model.condition_counts[CODES[tree_condition]]
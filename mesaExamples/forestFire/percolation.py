@@ -0,0 +1,147 @@
+"""
+Monte Carlo percolation study for the forest fire model.
+
+Burns N seeded forests for every density in a sweep, in a process pool,
+with the headless frontier engine (forest_fire.frontier.burn_forest), so
+no model or agents are built. For every density it reports the mean and
+standard deviation of the fraction of trees burned and of the steps until
+the fire goes out, and the fraction of runs where the fire reached the
+far column. Results are aggregated as runs finish, so memory does not
+grow with the number of runs; --runs-out also streams one row per run.
+
+Example:
+    python percolation.py --densities 0.5 0.55 0.6 0.65 0.7 --replicates 1000 \\
+        --size 100 --out percolation.csv
+"""
+
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from forest_fire.agent import BURNED_OUT, EMPTY
+from forest_fire.frontier import burn_forest
+
+RUN_FIELDS = ["density", "seed", "trees", "burned", "burn_fraction", "steps", "crossed"]
+SUMMARY_FIELDS = [
+    "density", "runs", "burn_fraction_mean", "burn_fraction_std",
+    "steps_mean", "steps_std", "crossed_fraction",
+]
+
+
+def run_one(config):
+    """Burn one forest and return its summary row."""
+    width, height, density, seed = config
+    conditions, steps = burn_forest(width, height, density, seed)
+    trees = int(np.count_nonzero(conditions != EMPTY))
+    burned = int(np.count_nonzero(conditions == BURNED_OUT))
+    return {
+        "density": density,
+        "seed": seed,
+        "trees": trees,
+        "burned": burned,
+        "burn_fraction": burned / trees if trees else 0.0,
+        "steps": steps,
+        # The fire starts in column 0, so a burned tree in the last column
+        # means it crossed the forest
+        "crossed": bool((conditions[-1] == BURNED_OUT).any()),
+    }
+
+
+class RunningStats:
+    """Mean and variance of a stream of values (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class DensitySummary:
+    def __init__(self):
+        self.burn_fraction = RunningStats()
+        self.steps = RunningStats()
+        self.crossed = 0
+
+    def add(self, row):
+        self.burn_fraction.add(row["burn_fraction"])
+        self.steps.add(row["steps"])
+        self.crossed += row["crossed"]
+
+    def row(self, density):
+        runs = self.steps.count
+        return {
+            "density": density,
+            "runs": runs,
+            "burn_fraction_mean": self.burn_fraction.mean,
+            "burn_fraction_std": self.burn_fraction.std,
+            "steps_mean": self.steps.mean,
+            "steps_std": self.steps.std,
+            "crossed_fraction": self.crossed / runs if runs else 0.0,
+        }
+
+
+def build_configs(args):
+    for density in args.densities:
+        # The same seeds for every density, so densities are compared on
+        # the same random draws
+        for seed in range(args.base_seed, args.base_seed + args.replicates):
+            yield args.size, args.size, density, seed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Percolation study of the forest fire model.")
+    parser.add_argument("--densities", type=float, nargs="+",
+                        default=[round(0.4 + 0.025 * i, 3) for i in range(13)])
+    parser.add_argument("--replicates", type=int, default=100)
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=100, help="side of the square forest")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--out", help="CSV file for the per-density summary (default: stdout)")
+    parser.add_argument("--runs-out", help="optional CSV file with one row per run")
+    args = parser.parse_args(argv)
+
+    summaries = {density: DensitySummary() for density in args.densities}
+    runs_file = open(args.runs_out, "w", newline="") if args.runs_out else None
+    try:
+        runs_writer = None
+        if runs_file:
+            runs_writer = csv.DictWriter(runs_file, fieldnames=RUN_FIELDS)
+            runs_writer.writeheader()
+        with multiprocessing.Pool(args.workers) as pool:
+            for row in pool.imap_unordered(run_one, build_configs(args), args.chunksize):
+                summaries[row["density"]].add(row)
+                if runs_writer:
+                    runs_writer.writerow(row)
+    finally:
+        if runs_file:
+            runs_file.close()
+
+    out = open(args.out, "w", newline="") if args.out else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for density in args.densities:
+            writer.writerow(summaries[density].row(density))
+    finally:
+        if args.out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,8 +23,7 @@ class Sheep(RandomWalker):
             self.energy -= 1
 
             # If there is grass available, eat it
-            this_cell = self.model.grid.get_cell_list_contents([self.pos])
-            grass_patch = [obj for obj in this_cell if isinstance(obj, GrassPatch)][0]
+            grass_patch = self.model.grid.get_cell_type_contents(self.pos, GrassPatch)[0]
             if grass_patch.fully_grown:
                 self.energy += self.model.sheep_gain_from_food
                 grass_patch.fully_grown = False
@@ -59,9 +58,7 @@ class Wolf(RandomWalker):
         self.energy -= 1
 
         # If there are sheep present, eat one
-        x, y = self.pos
-        this_cell = self.model.grid.get_cell_list_contents([self.pos])
-        sheep = [obj for obj in this_cell if isinstance(obj, Sheep)]
+        sheep = self.model.grid.get_cell_type_contents(self.pos, Sheep)
         if len(sheep) > 0:
             sheep_to_eat = self.random.choice(sheep)
             self.energy += self.model.wolf_gain_from_food
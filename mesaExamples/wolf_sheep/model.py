@@ -6,6 +6,7 @@ import mesa
 
 from agents import GrassPatch, Sheep, Wolf
 from scheduler import RandomActivationByTypeFiltered
+from typed_grid import MultiGridByType
 
 
 class WolfSheep(mesa.Model):
@@ -75,7 +76,8 @@ class WolfSheep(mesa.Model):
         self.sheep_gain_from_food = sheep_gain_from_food
 
         self.schedule = RandomActivationByTypeFiltered(self)
-        self.grid = mesa.space.MultiGrid(self.width, self.height, torus=True)
+        # Sheep and grass are looked up per cell when eating (see agents.py)
+        self.grid = MultiGridByType(self.width, self.height, True, [Sheep, GrassPatch])
         self.datacollector = mesa.DataCollector(
             {
                 "Wolves": lambda m: m.schedule.get_type_count(Wolf),
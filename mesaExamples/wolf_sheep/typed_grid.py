@@ -0,0 +1,49 @@
+"""
+MultiGrid that can look up the agents of a given type on a cell directly.
+"""
+
+import mesa
+
+
+class MultiGridByType(mesa.space.MultiGrid):
+    """
+    A MultiGrid that also keeps, for each of the given agent types, a list
+    of the agents of that type on every cell. The lists follow place_agent
+    and remove_agent (and move_agent, which calls both), so finding the
+    grass patch or the sheep on a cell never scans the other agents there.
+
+    Example:
+    >>> grid = MultiGridByType(20, 20, True, [Sheep, GrassPatch])
+    >>> grid.get_cell_type_contents((3, 4), Sheep)
+    """
+
+    def __init__(self, width, height, torus, agent_types):
+        super().__init__(width, height, torus)
+        self.agents_by_type = {
+            agent_type: [[[] for _ in range(height)] for _ in range(width)]
+            for agent_type in agent_types
+        }
+
+    def place_agent(self, agent, pos):
+        super().place_agent(agent, pos)
+        by_cell = self.agents_by_type.get(type(agent))
+        if by_cell is not None:
+            x, y = pos
+            if agent not in by_cell[x][y]:
+                by_cell[x][y].append(agent)
+
+    def remove_agent(self, agent):
+        x, y = agent.pos
+        super().remove_agent(agent)
+        by_cell = self.agents_by_type.get(type(agent))
+        if by_cell is not None:
+            by_cell[x][y].remove(agent)
+
+    def get_cell_type_contents(self, pos, agent_type):
+        """
+        The agents of agent_type on the cell at pos, in the order they
+        appear in get_cell_list_contents. The list is the index itself,
+        don't modify it.
+        """
+        x, y = pos
+        return self.agents_by_type[agent_type][x][y]